@@ -0,0 +1,151 @@
+# So sánh thời gian và bộ nhớ đỉnh (tracemalloc) của brute_force_segment_match
+# trước (SequenceMatcher mới cho mỗi cặp) và sau (giữ cố định segments2 bằng set_seq2),
+# cả hai cùng chuỗi lọc cận độ dài -> quick_ratio -> ratio nên chỉ khác ở việc dùng lại matcher
+# Đoạn văn sinh từ chuỗi Markov bigram học trên text1.txt + text2.txt (từ vựng, độ dài câu như văn bản thật)
+# Cách dùng: python benchmarks/bench_bruteforce.py [--size 1000] [--seed 0] [--workers N] [--memory-rows 100]
+# (tracemalloc làm chậm nhiều lần nên bộ nhớ đỉnh chỉ đo trên --memory-rows đoạn đầu của văn bản 1;
+# bộ nhớ đỉnh gần như không phụ thuộc số dòng vì mỗi lúc chỉ giữ một matcher)
+# Trả về mã lỗi 1 nếu hai cách cho kết quả khác nhau
+import os
+import random
+import sys
+import time
+import tracemalloc
+from difflib import SequenceMatcher
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bruteforce_match import (
+    brute_force_segment_match, length_ratio_bound, new_pruning_stats, parallel_segment_match
+)
+
+SENTENCE_END = (".", "!", "?")
+MAX_SENTENCE_WORDS = 60
+
+def train_bigrams(paths):
+    # Bảng từ kế tiếp của mỗi từ và các từ mở đầu câu, học từ văn bản thật
+    successors = {}
+    starts = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            words = f.read().lower().split()
+        prev = None
+        for word in words:
+            if prev is None or prev.endswith(SENTENCE_END):
+                starts.append(word)
+            else:
+                successors.setdefault(prev, []).append(word)
+            prev = word
+    return successors, starts
+
+def make_sentence(model, rng):
+    successors, starts = model
+    words = [rng.choice(starts)]
+    while not words[-1].endswith(SENTENCE_END) and len(words) < MAX_SENTENCE_WORDS:
+        nexts = successors.get(words[-1])
+        if not nexts:
+            break
+        words.append(rng.choice(nexts))
+    return " ".join(words)
+
+def make_segments(count, rng):
+    # Đoạn 3 câu như segment_by_sentence; khoảng 1/5 số đoạn văn bản 2 là bản chép có sửa vài từ
+    model = train_bigrams([os.path.join(ROOT, "text1.txt"), os.path.join(ROOT, "text2.txt")])
+    vocab = list(model[0])
+    originals = [" ".join(make_sentence(model, rng) for _ in range(3)) for _ in range(count)]
+    copies = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            words = rng.choice(originals).split()
+            for _ in range(max(1, len(words) // 10)):
+                words[rng.randrange(len(words))] = rng.choice(vocab)
+            copies.append(" ".join(words))
+        else:
+            copies.append(" ".join(make_sentence(model, rng) for _ in range(3)))
+    return originals, copies
+
+def previous_segment_match(segments1, segments2, threshold=0.6):
+    # Cách trước: cùng chuỗi lọc nhưng dựng SequenceMatcher mới (chỉ mục b2j của seg2) cho mỗi cặp
+    matches = []
+    lengths2 = [len(seg2) for seg2 in segments2]
+    for i, seg1 in enumerate(segments1):
+        best_sim = 0.0
+        best_j = -1
+        len1 = len(seg1)
+        for j, seg2 in enumerate(segments2):
+            bound = length_ratio_bound(len1, lengths2[j])
+            if bound < threshold or bound <= best_sim:
+                continue
+            matcher = SequenceMatcher(None, seg1, seg2)
+            bound = matcher.quick_ratio()
+            if bound < threshold or bound <= best_sim:
+                continue
+            sim = matcher.ratio()
+            if sim > best_sim:
+                best_sim = sim
+                best_j = j
+        if best_sim >= threshold:
+            matches.append((i, best_j, best_sim))
+    return matches
+
+def measure(func, segments1, segments2, memory_rows, timed_kwargs=None):
+    # Trả về (kết quả, giây, bộ nhớ đỉnh KB)
+    # Đo thời gian và bộ nhớ ở hai lần chạy riêng vì tracemalloc làm chậm chương trình nhiều lần
+    start = time.perf_counter()
+    result = func(segments1, segments2, **(timed_kwargs or {}))
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func(segments1[:memory_rows], segments2)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024
+
+def main():
+    size = 1000
+    seed = 0
+    workers = None
+    memory_rows = 100
+    if "--size" in sys.argv:
+        size = int(sys.argv[sys.argv.index("--size") + 1])
+    if "--seed" in sys.argv:
+        seed = int(sys.argv[sys.argv.index("--seed") + 1])
+    if "--workers" in sys.argv:
+        workers = int(sys.argv[sys.argv.index("--workers") + 1])
+    if "--memory-rows" in sys.argv:
+        memory_rows = int(sys.argv[sys.argv.index("--memory-rows") + 1])
+
+    rng = random.Random(seed)
+    segments2, segments1 = make_segments(size, rng)
+    print(f"Ma trận {size} x {size} đoạn")
+
+    old, old_time, old_peak = measure(previous_segment_match, segments1, segments2, memory_rows)
+    print(f"{'trước':<6} time={old_time:8.2f} s  peak={old_peak:10.1f} KB")
+
+    stats = new_pruning_stats()
+    new, new_time, new_peak = measure(
+        brute_force_segment_match, segments1, segments2, memory_rows, {"stats": stats}
+    )
+    print(f"{'sau':<6} time={new_time:8.2f} s  peak={new_peak:10.1f} KB  "
+          f"(nhanh hơn x{old_time / new_time if new_time else float('inf'):.2f})")
+    print(f"Lọc: {stats}")
+
+    if old != new:
+        print("Kết quả KHÁC NHAU giữa hai cách")
+        return 1
+
+    if workers:
+        start = time.perf_counter()
+        par = parallel_segment_match(segments1, segments2, workers=workers)
+        par_time = time.perf_counter() - start
+        print(f"{workers} process: time={par_time:8.2f} s  "
+              f"(nhanh hơn tuần tự x{new_time / par_time if par_time else float('inf'):.1f})")
+        if par != new:
+            print("Kết quả song song KHÁC kết quả tuần tự")
+            return 1
+    print(f"Kết quả giống nhau ({len(new)} đoạn khớp)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
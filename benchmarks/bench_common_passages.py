@@ -0,0 +1,87 @@
+# Đo thời gian các chiến lược tìm đoạn trùng nguyên văn (Winnowing, Suffix Automaton, GST)
+# với đầu vào list[str] và TokenDocument, đồng thời kiểm tra mọi cách biểu diễn cho cùng kết quả:
+# list[str], TokenDocument chung vocab, TokenDocument khác vocab, và trộn list[str] với TokenDocument
+# Cách dùng: python benchmarks/bench_common_passages.py [--words 20000] [--seed 0]
+# Trả về mã lỗi 1 nếu có cách biểu diễn cho kết quả khác
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fingerprint_winnowing import compare_winnowing
+from greedy_string_tiling import compare_greedy_tiling
+from suffix_automaton_match import compare_suffix_automaton
+from token_vocab import Vocabulary, encode_document
+
+STRATEGIES = {
+    "winnowing": compare_winnowing,
+    "suffix_automaton": compare_suffix_automaton,
+    "greedy_tiling": compare_greedy_tiling,
+}
+
+def make_texts(count, rng, vocab_size=3000):
+    # Văn bản 2 xen kẽ từ ngẫu nhiên với các đoạn 10-40 từ chép từ văn bản 1
+    vocab = [f"từ{i}" for i in range(vocab_size)]
+    words1 = [rng.choice(vocab) for _ in range(count)]
+    words2 = []
+    while len(words2) < count:
+        if rng.random() < 0.3:
+            start = rng.randrange(count - 40)
+            words2.extend(words1[start:start + rng.randint(10, 40)])
+        else:
+            words2.extend(rng.choice(vocab) for _ in range(rng.randint(5, 30)))
+    return words1, words2[:count]
+
+def input_variants(words1, words2):
+    shared = Vocabulary()
+    # Vocab riêng mã hóa theo thứ tự khác nhau nên cùng một từ có mã khác nhau ở 2 văn bản
+    own1 = Vocabulary()
+    own2 = Vocabulary(reversed(words2))
+    return {
+        "list": (words1, words2),
+        "chung vocab": (encode_document(words1, shared), encode_document(words2, shared)),
+        "khác vocab": (encode_document(words1, own1), encode_document(words2, own2)),
+        "list + doc": (words1, encode_document(words2, own2)),
+        "doc + list": (encode_document(words1, own1), words2),
+    }
+
+def comparable(result):
+    return {"similarity_score": result["similarity_score"], "details": result["details"]}
+
+def main():
+    count = 20000
+    seed = 0
+    if "--words" in sys.argv:
+        count = int(sys.argv[sys.argv.index("--words") + 1])
+    if "--seed" in sys.argv:
+        seed = int(sys.argv[sys.argv.index("--seed") + 1])
+
+    rng = random.Random(seed)
+    words1, words2 = make_texts(count, rng)
+    variants = input_variants(words1, words2)
+    print(f"2 văn bản {count} từ")
+
+    failed = False
+    for name, compare in STRATEGIES.items():
+        reference = None
+        for variant, (doc1, doc2) in variants.items():
+            start = time.perf_counter()
+            result = compare(doc1, doc2)
+            elapsed = time.perf_counter() - start
+            print(f"{name:<17} {variant:<12} time={elapsed:7.3f} s  score={result['similarity_score']:.4f}")
+            if reference is None:
+                reference = comparable(result)
+            elif comparable(result) != reference:
+                print("  KHÁC kết quả với đầu vào list[str]")
+                failed = True
+
+    if failed:
+        return 1
+    print("Mọi cách biểu diễn cho cùng kết quả")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+# So sánh thời gian vòng lặp cặp đoạn của divide_conquer_compare
+# trước (compare_two_segments không truyền features: mỗi cặp tự dựng tập từ, chuỗi ghép, và chỉ khi vượt
+# ngưỡng Jaccard mới dựng Counter / bigram / chuỗi chuẩn hóa - cùng khối lượng việc với code trước khi có
+# SegmentFeatures) và sau (SegmentFeatures dùng chung, mỗi đặc trưng tính tối đa một lần mỗi đoạn)
+# và kiểm tra chế độ "hierarchical" của divide_conquer_compare: không duyệt cặp nào trong khối bị prune,
+# final_similarity lệch chế độ "flat" không quá pruned_score_error_bound
+# Cách dùng: python benchmarks/bench_divide_conquer.py [--size 500] [--seed 0] [--modes-size 200]
+# (divide_conquer_compare ghi chi tiết mọi cặp ra JSON nên phần so chế độ dùng ma trận nhỏ hơn)
+# Trả về mã lỗi 1 nếu hai cách cho điểm khác nhau hoặc chế độ "hierarchical" vi phạm các điều trên
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from divide_conquer_compare import (
+    compare_two_segments, divide_conquer_compare, extract_segment_features, hierarchical_compare
+)
+from similarity_metrics_advanced import DocumentFrequencyIndex
+
+SEGMENT_LENGTH = 50
+
+def make_segments(count, rng, vocab_size=2000):
+    # Đoạn 50 từ ngẫu nhiên; khoảng 1/10 số đoạn văn bản 2 chép lại (có sửa) một đoạn văn bản 1
+    vocab = [f"từ{i}" for i in range(vocab_size)]
+    segments1 = [[rng.choice(vocab) for _ in range(SEGMENT_LENGTH)] for _ in range(count)]
+    segments2 = []
+    for _ in range(count):
+        if rng.random() < 0.1:
+            seg = list(rng.choice(segments1))
+            for _ in range(10):
+                seg[rng.randrange(SEGMENT_LENGTH)] = rng.choice(vocab)
+        else:
+            seg = [rng.choice(vocab) for _ in range(SEGMENT_LENGTH)]
+        segments2.append(seg)
+    return segments1, segments2
+
+def strip_timing(scores):
+    return {k: v for k, v in scores.items() if "time" not in k}
+
+def compare_modes(segments1, segments2):
+    # Chạy cả 2 chế độ trong thư mục tạm (divide_conquer_compare ghi divide_conquer_result.json vào thư mục hiện tại)
+    cwd = os.getcwd()
+    outputs = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for mode in ("flat", "hierarchical"):
+                start = time.perf_counter()
+                outputs[mode] = divide_conquer_compare(segments1, segments2, mode=mode)
+                elapsed = time.perf_counter() - start
+                print(f"{mode:<12} time={elapsed:8.2f} s  final_similarity={outputs[mode]['final_similarity']}  "
+                      f"pruned={outputs[mode]['pruned_pairs']}/{outputs[mode]['total_pairs']}")
+        finally:
+            os.chdir(cwd)
+    flat, tree = outputs["flat"], outputs["hierarchical"]
+    diff = abs(flat["final_similarity"] - tree["final_similarity"])
+    # Cộng 1e-4 cho phần làm tròn final_similarity đến 4 chữ số
+    print(f"Chênh lệch {diff:.4f}, cận cho phép {tree['pruned_score_error_bound']:.4f}")
+    return diff <= tree["pruned_score_error_bound"] + 1e-4
+
+def check_pruned_blocks_skipped(segments1, segments2):
+    # Ghi lại mọi cặp hierarchical_compare gọi score_pair; không cặp nào được nằm trong khối bị prune
+    df_index = DocumentFrequencyIndex(segments1 + segments2)
+    features1 = extract_segment_features(segments1, df_index)
+    features2 = extract_segment_features(segments2, df_index)
+    visited = []
+
+    def score_pair(i, j):
+        visited.append((i, j))
+        return {"segment1_idx": i, "segment2_idx": j, "weight": 1.0, "average_score": 0.0}, 1.0
+
+    tree = hierarchical_compare(features1, features2, score_pair)
+    blocks = tree["pruned_blocks"]
+    inside = [
+        (i, j) for i, j in visited
+        if any(i0 <= i < i1 and j0 <= j < j1 for (i0, i1), (j0, j1) in blocks)
+    ]
+    print(f"hierarchical: duyệt {len(visited)} cặp, {tree['block_pruned_pairs']} cặp trong {len(blocks)} khối bị prune")
+    return (not inside and len(set(visited)) == len(visited)
+            and len(visited) + tree["block_pruned_pairs"] == len(segments1) * len(segments2))
+
+def main():
+    size = 500
+    seed = 0
+    modes_size = 200
+    if "--size" in sys.argv:
+        size = int(sys.argv[sys.argv.index("--size") + 1])
+    if "--seed" in sys.argv:
+        seed = int(sys.argv[sys.argv.index("--seed") + 1])
+    if "--modes-size" in sys.argv:
+        modes_size = int(sys.argv[sys.argv.index("--modes-size") + 1])
+
+    rng = random.Random(seed)
+    segments1, segments2 = make_segments(size, rng)
+    print(f"Ma trận {size} x {size} đoạn ({SEGMENT_LENGTH} từ/đoạn)")
+
+    df_index = DocumentFrequencyIndex(segments1 + segments2)
+    tfidf1 = [df_index.tfidf_vector(seg) for seg in segments1]
+    tfidf2 = [df_index.tfidf_vector(seg) for seg in segments2]
+
+    # Trước: đặc trưng của cả 2 đoạn được tính lại ở mỗi cặp (phần nặng chỉ cho cặp vượt ngưỡng)
+    start = time.perf_counter()
+    old = [
+        strip_timing(compare_two_segments(seg1, seg2, tfidf1=tfidf1[i], tfidf2=tfidf2[j]))
+        for i, seg1 in enumerate(segments1)
+        for j, seg2 in enumerate(segments2)
+    ]
+    old_time = time.perf_counter() - start
+    print(f"{'trước':<6} time={old_time:8.2f} s")
+
+    # Sau: đặc trưng dùng chung, mỗi đoạn tính tối đa một lần rồi chỉ kết hợp trong vòng lặp cặp
+    start = time.perf_counter()
+    features1 = extract_segment_features(segments1, df_index)
+    features2 = extract_segment_features(segments2, df_index)
+    extract_time = time.perf_counter() - start
+    new = [
+        strip_timing(compare_two_segments(seg1, seg2, features1=features1[i], features2=features2[j]))
+        for i, seg1 in enumerate(segments1)
+        for j, seg2 in enumerate(segments2)
+    ]
+    new_time = time.perf_counter() - start
+    print(f"{'sau':<6} time={new_time:8.2f} s  (trích đặc trưng {extract_time:.2f} s, "
+          f"nhanh hơn x{old_time / new_time if new_time else float('inf'):.2f})")
+
+    pruned = sum(1 for scores in new if scores["pruned"])
+    print(f"Cặp bị pruning: {pruned}/{len(new)}")
+
+    if old != new:
+        print("Điểm KHÁC NHAU giữa hai cách")
+        return 1
+    print("Điểm giống nhau")
+
+    print(f"So 2 chế độ trên ma trận {min(modes_size, size)} x {min(modes_size, size)} đoạn")
+    if not check_pruned_blocks_skipped(segments1[:modes_size], segments2[:modes_size]):
+        print("hierarchical_compare DUYỆT cặp nằm trong khối bị prune")
+        return 1
+    if not compare_modes(segments1[:modes_size], segments2[:modes_size]):
+        print("final_similarity của hai chế độ lệch QUÁ cận cho phép")
+        return 1
+    print("Chế độ hierarchical bỏ qua mọi cặp trong khối bị prune, final_similarity trong cận cho phép")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+# Đo thời gian khởi động (import) của các entry point bằng `python -X importtime`
+# Cách dùng: python benchmarks/bench_import_time.py [--runs 5]
+# Trả về mã lỗi 1 nếu vượt ngân sách thời gian hoặc có thư viện nặng bị import sớm
+import os
+import subprocess
+import sys
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Ngân sách thời gian import (ms) cho từng entry point
+IMPORT_BUDGET_MS = {
+    "main": 150,
+    "testing_evaluation": 150,
+    "preprocess_text": 100,
+}
+
+# Thư viện nặng không được import khi chỉ mới nạp module
+HEAVY_MODULES = ("underthesea", "chardet", "matplotlib", "numpy")
+
+def measure_import(module):
+    # Chạy một process mới với -X importtime, trả về (tổng ms, danh sách module đã import)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Không import được {module}:\n{proc.stderr}")
+
+    total_us = 0
+    imported = []
+    for line in proc.stderr.splitlines():
+        # Dạng: "import time:   self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        name = parts[2].strip()
+        imported.append(name)
+        # Module cấp cao nhất chỉ thụt lề một khoảng trắng
+        if parts[2].rstrip() == " " + module:
+            total_us = int(parts[1])
+    return total_us / 1000, imported
+
+def main():
+    runs = 5
+    if "--runs" in sys.argv:
+        runs = int(sys.argv[sys.argv.index("--runs") + 1])
+
+    failed = False
+    for module, budget in IMPORT_BUDGET_MS.items():
+        times = []
+        imported = []
+        for _ in range(runs):
+            ms, imported = measure_import(module)
+            times.append(ms)
+        median = statistics.median(times)
+
+        heavy = sorted({name.split(".")[0] for name in imported} & set(HEAVY_MODULES))
+        status = "OK"
+        if median > budget or heavy:
+            status = "VƯỢT NGÂN SÁCH"
+            failed = True
+
+        print(f"{module:<20} median={median:7.1f} ms  budget={budget} ms  [{status}]")
+        if heavy:
+            print(f"  Thư viện nặng bị import sớm: {', '.join(heavy)}")
+
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,26 +2,127 @@ from segmenter import segment_by_sentence
 from difflib import SequenceMatcher
 import time
 import json
+from token_vocab import to_words
 
 def sentence_similarity(s1, s2):
     return SequenceMatcher(None, s1, s2).ratio()
 
-def brute_force_segment_match(segments1, segments2, threshold=0.6):
-    matches = []
-
-    for i, seg1 in enumerate(segments1):
-        best_sim = 0.0
-        best_j = -1
-
-        for j, seg2 in enumerate(segments2):
-            sim = sentence_similarity(seg1, seg2)
-            if sim > best_sim:
-                best_sim = sim
-                best_j = j
+def length_ratio_bound(len1, len2):
+    # Cận trên của ratio chỉ từ độ dài (đúng bằng real_quick_ratio, không cần dựng SequenceMatcher)
+    total = len1 + len2
+    if total == 0:
+        return 1.0
+    return 2.0 * min(len1, len2) / total
+
+def new_pruning_stats():
+    return {
+        "total_pairs": 0,
+        "pruned_by_length": 0,        # Loại nhờ cận độ dài (real_quick_ratio)
+        "pruned_by_quick_ratio": 0,   # Loại nhờ quick_ratio (đếm ký tự chung)
+        "full_ratio_calls": 0         # Số lần phải tính ratio() đầy đủ
+    }
 
-        if best_sim >= threshold:
-            matches.append((i, best_j, best_sim))
+def brute_force_segment_match(segments1, segments2, threshold=0.6, stats=None):
+    """
+    Với mỗi đoạn của văn bản 1 tìm đoạn giống nhất của văn bản 2
+    Vòng ngoài duyệt segments2 và giữ cố định bằng set_seq2 (SequenceMatcher chỉ dựng chỉ mục
+    b2j / đếm ký tự của đoạn đó một lần), vòng trong đổi segments1 bằng set_seq1;
+    đoạn tốt nhất của từng đoạn văn bản 1 được giữ trong mảng best_sim / best_j
+    Mỗi cặp đi qua chuỗi lọc: cận độ dài -> quick_ratio() -> ratio()
+    Cặp bị bỏ khi cận trên < threshold hoặc không thể vượt best_sim hiện tại,
+    nên kết quả giống hệt khi tính ratio() cho mọi cặp
+    stats: dict (new_pruning_stats) để cộng dồn số cặp bị loại ở từng tầng
+    """
+    if stats is None:
+        stats = new_pruning_stats()
+
+    n = len(segments1)
+    best_sim = [0.0] * n
+    best_j = [-1] * n
+    lengths1 = [len(seg1) for seg1 in segments1]
+    matcher = SequenceMatcher(None)
+
+    # Duyệt j tăng dần và chỉ cập nhật khi lớn hơn hẳn: giữ đúng cặp được chọn khi hòa điểm
+    for j, seg2 in enumerate(segments2):
+        len2 = len(seg2)
+        matcher.set_seq2(seg2)
+
+        for i, seg1 in enumerate(segments1):
+            # Ngưỡng cần đạt: ít nhất threshold và phải lớn hơn hẳn best_sim của dòng i
+            current = best_sim[i]
+            bound = length_ratio_bound(lengths1[i], len2)
+            if bound < threshold or bound <= current:
+                stats["pruned_by_length"] += 1
+                continue
+
+            matcher.set_seq1(seg1)
+            bound = matcher.quick_ratio()
+            if bound < threshold or bound <= current:
+                stats["pruned_by_quick_ratio"] += 1
+                continue
+
+            stats["full_ratio_calls"] += 1
+            sim = matcher.ratio()
+            if sim > current:
+                best_sim[i] = sim
+                best_j[i] = j
+
+    stats["total_pairs"] += n * len(segments2)
+    return [
+        (i, best_j[i], best_sim[i])
+        for i in range(n)
+        if best_sim[i] >= threshold
+    ]
+
+# Dữ liệu dùng chung trong mỗi worker: segments2 chỉ được gửi một lần qua initializer
+_WORKER_SEGMENTS2 = None
+_WORKER_THRESHOLD = None
+
+def _init_match_worker(segments2, threshold):
+    global _WORKER_SEGMENTS2, _WORKER_THRESHOLD
+    _WORKER_SEGMENTS2 = segments2
+    _WORKER_THRESHOLD = threshold
+
+def _match_chunk(offset, chunk):
+    # So khớp một khối đoạn của văn bản 1, trả về chỉ số dòng đã cộng offset
+    stats = new_pruning_stats()
+    matches = brute_force_segment_match(chunk, _WORKER_SEGMENTS2, _WORKER_THRESHOLD, stats)
+    return [(offset + i, j, sim) for i, j, sim in matches], stats
+
+def parallel_segment_match(segments1, segments2, threshold=0.6, workers=None, stats=None):
+    """
+    Như brute_force_segment_match nhưng chia segments1 thành các khối chạy trên process pool
+    Các dòng độc lập nhau nên kết quả (kể cả thứ tự) giống hệt khi chạy tuần tự
+    workers: số process; mặc định (None) hoặc 1 thì chạy tuần tự trong process hiện tại,
+    giống bruteforce_match và main.py - chỉ dùng process pool khi được yêu cầu rõ (vd os.cpu_count())
+    """
+    if stats is None:
+        stats = new_pruning_stats()
+    workers = max(1, min(workers or 1, len(segments1)))
+    if workers == 1:
+        return brute_force_segment_match(segments1, segments2, threshold, stats)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # Vài khối cho mỗi worker để cân tải khi các dòng tốn thời gian khác nhau
+    chunk_size = max(1, -(-len(segments1) // (workers * 4)))
+    chunks = [
+        (offset, segments1[offset:offset + chunk_size])
+        for offset in range(0, len(segments1), chunk_size)
+    ]
 
+    matches = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_match_worker,
+        initargs=(segments2, threshold)
+    ) as pool:
+        futures = [pool.submit(_match_chunk, offset, chunk) for offset, chunk in chunks]
+        for future in futures:
+            chunk_matches, chunk_stats = future.result()
+            matches.extend(chunk_matches)
+            for key, value in chunk_stats.items():
+                stats[key] += value
     return matches
 
 def calculate_similarity(total_segments_text1, matched_segments):
@@ -29,7 +130,8 @@ def calculate_similarity(total_segments_text1, matched_segments):
         return 0.0
     return matched_segments / total_segments_text1
 
-def bruteforce_match(words1, words2, threshold=0.6):
+def bruteforce_match(words1, words2, threshold=0.6, workers=None):
+    # workers: số process để so khớp song song (mặc định None/1 = tuần tự, như parallel_segment_match)
     start_time = time.time()
 
     warnings = []
@@ -38,14 +140,15 @@ def bruteforce_match(words1, words2, threshold=0.6):
     if len(words2) < 5:
         warnings.append("Văn bản 2 quá ngắn (<5 từ)")
 
-    text1 = " ".join(words1)
-    text2 = " ".join(words2)
+    text1 = " ".join(to_words(words1))
+    text2 = " ".join(to_words(words2))
 
     segments1 = segment_by_sentence(text1, 3)
     segments2 = segment_by_sentence(text2, 3)
 
-    segment_matches = brute_force_segment_match(
-        segments1, segments2, threshold
+    pruning = new_pruning_stats()
+    segment_matches = parallel_segment_match(
+        segments1, segments2, threshold, workers=workers, stats=pruning
     )
 
     similarity = calculate_similarity(
@@ -64,6 +167,8 @@ def bruteforce_match(words1, words2, threshold=0.6):
             "segments_text2": len(segments2),
             "matched_segments": len(segment_matches),
             "threshold": threshold,
+            "workers": workers or 1,
+            "pruning": pruning,
             "warnings": warnings,
             "top_segment_matches": [
                 {
@@ -0,0 +1,207 @@
+# Lưu corpus đã tiền xử lý ở dạng nhị phân gọn và đọc lại bằng memory-map (chỉ đọc)
+#
+# Cấu trúc file (little-endian, mỗi phần căn lề 8 byte):
+#   header        : magic, version, số văn bản, số từ, kích thước từ vựng, offset các phần
+#   vocab_offsets : (V + 1) x uint64 - vị trí từng từ trong vocab_blob
+#   vocab_blob    : các từ mã hóa UTF-8 nối liền nhau
+#   tokens        : N x uint32 - mã số từ của toàn bộ corpus nối liền nhau
+#   doc_offsets   : (D + 1) x uint64 - văn bản i là tokens[doc_offsets[i]:doc_offsets[i+1]]
+#   names         : JSON UTF-8 - tên các văn bản
+#
+# Mở file chỉ tốn thời gian đọc header; các process cùng mở một file dùng chung trang nhớ.
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+from token_vocab import Vocabulary, TokenDocument
+
+MAGIC = b"PTCORPUS"
+FORMAT_VERSION = 1
+
+# magic, version, (dự phòng), num_docs, num_tokens, vocab_size,
+# offset: vocab_offsets, vocab_blob, tokens, doc_offsets, names, kích thước names
+HEADER = struct.Struct("<8sIIQQQQQQQQQ")
+
+def _pad(f):
+    # Căn lề 8 byte cho phần tiếp theo
+    pos = f.tell()
+    if pos % 8:
+        f.write(b"\0" * (8 - pos % 8))
+    return f.tell()
+
+def _write_array(f, arr):
+    if sys.byteorder != "little":
+        arr = array(arr.typecode, arr)
+        arr.byteswap()
+    arr.tofile(f)
+
+def write_corpus(path, documents, names=None, vocab=None):
+    """
+    Ghi corpus ra file nhị phân
+    documents: danh sách văn bản, mỗi văn bản là list từ hoặc TokenDocument
+    names: tên các văn bản (mặc định doc0, doc1, ...)
+    vocab: Vocabulary dùng chung (mặc định tạo mới)
+    """
+    if vocab is None:
+        vocab = Vocabulary()
+
+    tokens = array("I")
+    doc_offsets = array("Q", [0])
+    for doc in documents:
+        if isinstance(doc, TokenDocument) and doc.vocab is vocab:
+            tokens.extend(doc.ids)
+        else:
+            if isinstance(doc, TokenDocument):
+                doc = doc.words()
+            tokens.extend(vocab.encode(doc))
+        doc_offsets.append(len(tokens))
+
+    num_docs = len(doc_offsets) - 1
+    if names is None:
+        names = [f"doc{i}" for i in range(num_docs)]
+    if len(names) != num_docs:
+        raise ValueError("Số tên không khớp số văn bản")
+
+    vocab_offsets = array("Q", [0])
+    blob = bytearray()
+    for token in vocab.id_to_token:
+        blob += token.encode("utf-8")
+        vocab_offsets.append(len(blob))
+    names_raw = json.dumps(list(names), ensure_ascii=False).encode("utf-8")
+
+    with open(path, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        off_vocab_offsets = _pad(f)
+        _write_array(f, vocab_offsets)
+        off_vocab_blob = _pad(f)
+        f.write(blob)
+        off_tokens = _pad(f)
+        _write_array(f, tokens)
+        off_doc_offsets = _pad(f)
+        _write_array(f, doc_offsets)
+        off_names = _pad(f)
+        f.write(names_raw)
+
+        f.seek(0)
+        f.write(HEADER.pack(
+            MAGIC, FORMAT_VERSION, 0,
+            num_docs, len(tokens), len(vocab),
+            off_vocab_offsets, off_vocab_blob, off_tokens, off_doc_offsets,
+            off_names, len(names_raw)
+        ))
+
+    return path
+
+
+class MappedVocabulary:
+    """
+    Từ vựng đọc trực tiếp từ vùng nhớ map, chỉ giải mã từ khi cần
+    (có cùng giao diện token/decode như Vocabulary để TokenDocument dùng được)
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+        self._lookup = None
+
+    def token(self, idx):
+        return str(self.blob[self.offsets[idx]:self.offsets[idx + 1]], "utf-8")
+
+    def decode(self, ids):
+        return [self.token(i) for i in ids]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def lookup(self, token):
+        # Tra mã số của một từ (bảng tra cứu chỉ được dựng ở lần gọi đầu), không có thì None
+        if self._lookup is None:
+            self._lookup = {self.token(i): i for i in range(len(self))}
+        return self._lookup.get(token)
+
+    def to_vocabulary(self):
+        # Dựng Vocabulary đầy đủ (có thể thêm từ mới) để mã hóa văn bản truy vấn
+        return Vocabulary(self.token(i) for i in range(len(self)))
+
+
+class CorpusStore:
+    """
+    Corpus nhị phân mở bằng mmap chỉ đọc
+    store.document(i) trả về TokenDocument trỏ thẳng vào vùng nhớ map (không sao chép)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        mv = memoryview(self._mmap)
+
+        (magic, version, _, num_docs, num_tokens, vocab_size,
+         off_vocab_offsets, off_vocab_blob, off_tokens, off_doc_offsets,
+         off_names, names_size) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Không phải file corpus: {path}")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Phiên bản corpus không hỗ trợ: {version}")
+
+        vocab_offsets = self._section(mv, off_vocab_offsets, vocab_size + 1, "Q")
+        blob_size = vocab_offsets[-1] if vocab_size else 0
+        self.vocab = MappedVocabulary(vocab_offsets, mv[off_vocab_blob:off_vocab_blob + blob_size])
+        self.tokens = self._section(mv, off_tokens, num_tokens, "I")
+        self.doc_offsets = self._section(mv, off_doc_offsets, num_docs + 1, "Q")
+        self.names = json.loads(str(mv[off_names:off_names + names_size], "utf-8"))
+
+    @staticmethod
+    def _section(mv, offset, count, typecode):
+        size = array(typecode).itemsize
+        view = mv[offset:offset + count * size]
+        if sys.byteorder == "little":
+            return view.cast(typecode)
+        # Máy big-endian: phải sao chép và đảo byte
+        arr = array(typecode, view.tobytes())
+        arr.byteswap()
+        return arr
+
+    def __len__(self):
+        return len(self.doc_offsets) - 1
+
+    def document(self, idx):
+        start = self.doc_offsets[idx]
+        end = self.doc_offsets[idx + 1]
+        return TokenDocument(self.tokens[start:end], self.vocab)
+
+    def documents(self):
+        for idx in range(len(self)):
+            yield self.document(idx)
+
+    def document_by_name(self, name):
+        return self.document(self.names.index(name))
+
+    def close(self):
+        # Giải phóng các memoryview trước khi đóng mmap
+        for attr in ("tokens", "doc_offsets", "vocab"):
+            if hasattr(self, attr):
+                delattr(self, attr)
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Còn TokenDocument đang trỏ vào vùng map: để GC đóng sau
+                pass
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_corpus(path):
+    # Mở corpus nhị phân (chỉ đọc, memory-map)
+    return CorpusStore(path)
@@ -1,24 +1,32 @@
 ﻿# Chiến lược Chia để trị: So sánh từng đoạn văn bản với tối ưu hiệu suất
 import json
+import math
 import time
 import logging
 import os
-from typing import List, Dict
+import sys
+from typing import List, Dict, Tuple
 
 # Import các hàm similarity từ các thành viên khác
-from similarity_jaccard import jaccard_similarity
-from similarity_cosin import cosine_similarity, vectorize
-from similarity_metrics_advanced import ngram_similarity, tfidf_similarity, compute_tfidf, compute_tf, compute_idf
-from edit_distance_dp import edit_distance_to_similarity, edit_distance_dp  # từ TV5
+from similarity_jaccard import DocumentProfile
+from similarity_metrics_advanced import (
+    ngram_similarity, compute_tf, pair_tfidf_similarity, DocumentFrequencyIndex, tfidf_cosine
+)
+from edit_distance_dp import (  # từ TV5
+    edit_distance_to_similarity, compute_normalized_edit_distance, DEFAULT_EDIT_METHOD,
+    levenshtein_within, similarity_threshold_to_max_distance, normalize_unicode
+)
+from token_vocab import to_words
 
 # Fallback nếu TV2 chưa xong
 from segmenter import segment_by_length
 from preprocess_text import preprocess
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-
 # Cấu hình cải tiến
 JACCARD_THRESHOLD = 0.15          # Ngưỡng pruning (có thể chỉnh để test)
+# Ngưỡng Edit similarity: nếu đặt (vd 0.5) thì loại ngay cặp chênh lệch độ dài quá k, k nhỏ thì chỉ tính dải 2k+1,
+# cặp có edit similarity dưới ngưỡng được ghi 0.0. None = luôn tính chính xác.
+EDIT_SIMILARITY_THRESHOLD = None
 METRIC_WEIGHTS = {
     "jaccard": 0.20,
     "cosine": 0.25,
@@ -41,21 +49,116 @@ def load_segments(file_path: str = "segments.json") -> Dict:
         segments2 = segment_by_length(data2['cleaned'], 50)
         return {"text1_segments": segments1, "text2_segments": segments2}
 
-def compare_two_segments(seg1: List[str], seg2: List[str]) -> Dict:
-    """So sánh 1 cặp đoạn với pruning + đo thời gian từng metric"""
+class SegmentFeatures:
+    """Đặc trưng của 1 đoạn, dùng lại cho mọi cặp chứa đoạn đó
+    Tập từ và độ dài (cần cho bước lọc Jaccard) tính ngay; các phần còn lại tính ở lần dùng đầu tiên
+    nên đoạn chỉ nằm trong cặp bị prune không phải trả chi phí đó:
+    profile (Counter, tập bigram), chuẩn L2 của Counter, TF, chuỗi ghép,
+    chuỗi đã chuẩn hóa Unicode, và (vector, chuẩn) TF-IDF nếu có DocumentFrequencyIndex"""
+
+    __slots__ = ('seg', 'unique', 'length', 'df_index',
+                 '_profile', '_count_norm', '_tf', '_text', '_normalized', '_tfidf')
+
+    def __init__(self, seg: List[str], df_index: DocumentFrequencyIndex = None):
+        self.seg = seg
+        self.unique = set(seg)
+        self.length = len(seg)
+        self.df_index = df_index
+        self._profile = None
+        self._count_norm = None
+        self._tf = None
+        self._text = None
+        self._normalized = None
+        self._tfidf = None
+
+    @property
+    def profile(self) -> DocumentProfile:
+        if self._profile is None:
+            self._profile = DocumentProfile(self.seg, bigrams=True)
+        return self._profile
+
+    @property
+    def count_norm(self) -> float:
+        if self._count_norm is None:
+            self._count_norm = math.sqrt(sum(c * c for c in self.profile.counts.values()))
+        return self._count_norm
+
+    @property
+    def tf(self) -> Dict:
+        if self._tf is None:
+            self._tf = compute_tf(self.profile)
+        return self._tf
+
+    @property
+    def text(self) -> str:
+        # Đoạn có thể là list từ hoặc TokenDocument (mã số), edit distance cần chuỗi gốc
+        if self._text is None:
+            self._text = ' '.join(to_words(self.seg))
+        return self._text
+
+    @property
+    def normalized(self) -> str:
+        if self._normalized is None:
+            self._normalized = normalize_unicode(self.text)
+        return self._normalized
+
+    @property
+    def tfidf(self) -> Tuple:
+        if self._tfidf is None and self.df_index is not None:
+            self._tfidf = self.df_index.tfidf_vector(self.seg)
+        return self._tfidf
+
+def extract_segment_features(segments: List[List[str]], df_index: DocumentFrequencyIndex = None) -> List[SegmentFeatures]:
+    """Tính đặc trưng cho mọi đoạn của một văn bản"""
+    return [SegmentFeatures(seg, df_index) for seg in segments]
+
+def _count_cosine(f1: SegmentFeatures, f2: SegmentFeatures) -> float:
+    # Cosine trên Counter thưa: chỉ duyệt từ của đoạn ít từ hơn (tích vô hướng là số nguyên nên
+    # giống hệt cách vector hóa dày trên vocab chung)
+    if not f1.count_norm or not f2.count_norm:
+        return 0.0
+    c1, c2 = f1.profile.counts, f2.profile.counts
+    if len(c1) > len(c2):
+        c1, c2 = c2, c1
+    dot = sum(c * c2.get(w, 0) for w, c in c1.items())
+    return dot / (f1.count_norm * f2.count_norm)
+
+def compare_two_segments(seg1: List[str], seg2: List[str], edit_method: str = DEFAULT_EDIT_METHOD,
+                         edit_threshold: float = None, tfidf1: Tuple = None, tfidf2: Tuple = None,
+                         features1: SegmentFeatures = None, features2: SegmentFeatures = None) -> Dict:
+    """So sánh 1 cặp đoạn với pruning + đo thời gian từng metric
+    edit_method: "dp" hoặc "bitparallel"
+    edit_threshold: ngưỡng edit similarity cho bản có ngưỡng (mặc định EDIT_SIMILARITY_THRESHOLD)
+    tfidf1/tfidf2: (vector, chuẩn) TF-IDF tính sẵn từ DocumentFrequencyIndex của cả corpus;
+    nếu có (kể cả trong features) thì báo thêm "tfidf_corpus" (cosine với IDF của cả corpus,
+    không tính vào METRIC_WEIGHTS). Metric "tfidf" luôn dùng IDF chỉ trên 2 đoạn như cũ
+    features1/features2: SegmentFeatures dùng chung; không có thì tạo cho riêng cặp này
+    (phần đặc trưng nặng chỉ được tính khi cặp vượt ngưỡng Jaccard)"""
+    if edit_threshold is None:
+        edit_threshold = EDIT_SIMILARITY_THRESHOLD
     start_total = time.time()
+    if features1 is None:
+        features1 = SegmentFeatures(seg1)
+    if features2 is None:
+        features2 = SegmentFeatures(seg2)
+    # Vector TF-IDF trong features chỉ được tính khi cặp không bị prune
+    corpus_tfidf = ((tfidf1 is not None or features1.df_index is not None)
+                    and (tfidf2 is not None or features2.df_index is not None))
+
     warnings = []
-    if len(seg1) < 5:
+    if features1.length < 5:
         warnings.append("Đoạn 1 quá ngắn (<5 từ)")
-    if len(seg2) < 5:
+    if features2.length < 5:
         warnings.append("Đoạn 2 quá ngắn (<5 từ)")
 
-    str1 = ' '.join(seg1)
-    str2 = ' '.join(seg2)
+    str1 = features1.text
+    str2 = features2.text
 
-    # 1. Jaccard (nhanh, dùng để prune)
+    # 1. Jaccard (nhanh, dùng để prune; chỉ cần tập từ, giống jaccard_similarity)
     start_j = time.time()
-    jaccard = jaccard_similarity(seg1, seg2)
+    common = len(features1.unique & features2.unique)
+    union = len(features1.unique) + len(features2.unique) - common
+    jaccard = common / union if union else 0.0
     time_j = time.time() - start_j
 
     scores = {
@@ -78,44 +181,59 @@ def compare_two_segments(seg1: List[str], seg2: List[str]) -> Dict:
             "time_edit": 0.0,
             "time_tfidf": 0.0
         })
+        if corpus_tfidf:
+            scores["tfidf_corpus"] = 0.0
+            scores["time_tfidf_corpus"] = 0.0
     else:
         # Cosine
         start_c = time.time()
-        vocab = list(set(seg1) | set(seg2))
-        vec1 = vectorize(seg1, vocab)
-        vec2 = vectorize(seg2, vocab)
-        cosine = cosine_similarity(vec1, vec2)
+        cosine = _count_cosine(features1, features2)
         time_c = time.time() - start_c
         scores["cosine"] = round(cosine, 4)
         scores["time_cosine"] = round(time_c, 4)
 
         # N-gram
         start_n = time.time()
-        ngram_sim = ngram_similarity(seg1, seg2, n=2)
+        ngram_sim = ngram_similarity(features1.profile, features2.profile, n=2)
         time_n = time.time() - start_n
         scores["ngram_bigram"] = round(ngram_sim, 4)
         scores["time_ngram"] = round(time_n, 4)
 
-        # Edit Distance
+        # Edit Distance (trên chuỗi đã chuẩn hóa sẵn, tỉ lệ theo độ dài chuỗi gốc như trước)
         start_e = time.time()
-        edit_dist = edit_distance_dp(str1, str2)
-        edit_sim = edit_distance_to_similarity(edit_dist, len(str1), len(str2))
+        norm1, norm2 = features1.normalized, features2.normalized
+        if edit_threshold is None:
+            edit_dist = compute_normalized_edit_distance(norm1, norm2, edit_method)
+            edit_sim = edit_distance_to_similarity(edit_dist, len(str1), len(str2))
+        else:
+            max_dist = similarity_threshold_to_max_distance(edit_threshold, len(str1), len(str2))
+            edit_dist = levenshtein_within(norm1, norm2, max_dist)
+            exceeds = edit_dist is None
+            edit_sim = 0.0 if exceeds else edit_distance_to_similarity(edit_dist, len(str1), len(str2))
+            scores["edit_exceeds_threshold"] = exceeds
         time_e = time.time() - start_e
         scores["edit_distance_similarity"] = round(edit_sim, 4)
         scores["time_edit"] = round(time_e, 4)
 
-        # TF-IDF
+        # TF-IDF (IDF chỉ trên 2 đoạn)
         start_t = time.time()
-        tf1 = compute_tf(seg1)
-        tf2 = compute_tf(seg2)
-        idf = compute_idf([seg1, seg2])
-        tfidf1 = compute_tfidf(tf1, idf)
-        tfidf2 = compute_tfidf(tf2, idf)
-        tfidf_sim = tfidf_similarity(tfidf1, tfidf2)
+        tfidf_sim = pair_tfidf_similarity(features1.tf, features2.tf)
         time_t = time.time() - start_t
         scores["tfidf"] = round(tfidf_sim, 4)
         scores["time_tfidf"] = round(time_t, 4)
 
+        # TF-IDF với IDF của cả corpus (chỉ báo cáo thêm)
+        if corpus_tfidf:
+            start_t = time.time()
+            if tfidf1 is None:
+                tfidf1 = features1.tfidf
+            if tfidf2 is None:
+                tfidf2 = features2.tfidf
+            tfidf_corpus = tfidf_cosine(tfidf1[0], tfidf1[1], tfidf2[0], tfidf2[1])
+            time_t = time.time() - start_t
+            scores["tfidf_corpus"] = round(tfidf_corpus, 4)
+            scores["time_tfidf_corpus"] = round(time_t, 4)
+
     total_time = time.time() - start_total
     return {
         **scores,
@@ -126,8 +244,165 @@ def compare_two_segments(seg1: List[str], seg2: List[str]) -> Dict:
         "str2_preview": str2[:120] + '...' if len(str2) > 120 else str2
     }
 
-def divide_conquer_compare(segments1: List[List[str]], segments2: List[List[str]]) -> Dict:
-    """Chiến lược chính với pruning và trọng số nâng cao"""
+def _average_score(scores: Dict) -> float:
+    # Trung bình có trọng số các metric
+    weighted_sum = sum(scores[k] * METRIC_WEIGHTS.get(k, 0.0) for k in METRIC_WEIGHTS)
+    return weighted_sum / sum(METRIC_WEIGHTS.values())
+
+def _pair_result(i: int, j: int, len1: int, len2: int, scores: Dict) -> Tuple[Dict, float]:
+    """Gộp điểm của 1 cặp đoạn (độ dài len1, len2 từ) thành bản ghi kết quả, trả về (bản ghi, trọng số chưa làm tròn)"""
+    # Trọng số: trung bình độ dài + TF-IDF (nếu không prune)
+    seg_weight = (len1 + len2) / 2
+    tfidf_boost = scores.get("tfidf", 0.0) if not scores["pruned"] else 0.0
+    weight = seg_weight + tfidf_boost
+
+    average_score = _average_score(scores)
+
+    return {
+        "segment1_idx": i,
+        "segment2_idx": j,
+        "weight": round(weight, 2),
+        "scores": {k: v for k, v in scores.items() if k not in ["warnings", "str1_preview", "str2_preview", "pruned"]},
+        "average_score": round(average_score, 4),
+        "pruned": scores["pruned"],
+        "warnings": scores.get("warnings", []),
+        "str1_preview": scores.get("str1_preview"),
+        "str2_preview": scores.get("str2_preview")
+    }, weight
+
+class _BlockSide:
+    """Thông tin theo khối (dãy đoạn liên tiếp [start, end)) của một văn bản, có ghi nhớ"""
+
+    def __init__(self, features: List[SegmentFeatures]):
+        self.sets = [f.unique for f in features]
+        self.length_prefix = [0]
+        self.size_prefix = [0]
+        for f, words in zip(features, self.sets):
+            self.length_prefix.append(self.length_prefix[-1] + f.length)
+            self.size_prefix.append(self.size_prefix[-1] + len(words))
+        self._doc_freqs = {}
+        self._min_sizes = {}
+
+    def doc_freq(self, start: int, end: int) -> Dict:
+        # Từ -> số đoạn trong khối chứa từ đó (khóa là tập từ gộp của khối);
+        # khối con được chia cố định nên mỗi khối chỉ gộp một lần
+        key = (start, end)
+        if key not in self._doc_freqs:
+            if end - start == 1:
+                self._doc_freqs[key] = dict.fromkeys(self.sets[start], 1)
+            else:
+                mid = (start + end) // 2
+                left, right = self.doc_freq(start, mid), self.doc_freq(mid, end)
+                if len(left) < len(right):
+                    left, right = right, left
+                merged = dict(left)
+                for w, c in right.items():
+                    merged[w] = merged.get(w, 0) + c
+                self._doc_freqs[key] = merged
+        return self._doc_freqs[key]
+
+    def min_size(self, start: int, end: int) -> int:
+        # Số từ phân biệt nhỏ nhất của một đoạn trong khối
+        key = (start, end)
+        if key not in self._min_sizes:
+            self._min_sizes[key] = min(len(s) for s in self.sets[start:end])
+        return self._min_sizes[key]
+
+    def total_length(self, start: int, end: int) -> int:
+        return self.length_prefix[end] - self.length_prefix[start]
+
+    def total_size(self, start: int, end: int) -> int:
+        return self.size_prefix[end] - self.size_prefix[start]
+
+def _halves(start: int, end: int) -> List[Tuple[int, int]]:
+    if end - start == 1:
+        return [(start, end)]
+    mid = (start + end) // 2
+    return [(start, mid), (mid, end)]
+
+def hierarchical_compare(features1: List[SegmentFeatures], features2: List[SegmentFeatures], score_pair) -> Dict:
+    """Chia để trị theo khối: so khối đoạn liên tiếp bằng tập từ gộp, chỉ đệ quy vào khối có thể giống
+    Với khối I, J: Jaccard(a, b) <= |a ∩ b| / max(|a|, |b|) <= |U_I ∩ U_J| / max(min|a|, min|b|),
+    nên khi vế phải < JACCARD_THRESHOLD thì mọi cặp trong khối đều bị prune ở chế độ thường
+    Khối bị prune không duyệt cặp nào mà được tính gộp một lần:
+    - trọng số = sum((len_a + len_b) / 2) = (số cột * tổng độ dài I + số dòng * tổng độ dài J) / 2 (tổng tiền tố)
+    - Jaccard gộp = sum|a ∩ b| / sum|a ∪ b|, với sum|a ∩ b| = sum_w df_I(w) * df_J(w) (df = số đoạn chứa w)
+      và sum|a ∪ b| = số cột * sum|a| + số dòng * sum|b| - sum|a ∩ b|
+    - điểm = Jaccard gộp * tỉ trọng Jaccard trong METRIC_WEIGHTS (chế độ thường cũng chỉ có Jaccard cho cặp bị prune)
+    Mỗi cặp bị prune ở chế độ thường có điểm trong [0, tỉ trọng Jaccard * JACCARD_THRESHOLD], điểm gộp cũng vậy,
+    nên final_similarity lệch chế độ thường không quá tỉ trọng Jaccard * JACCARD_THRESHOLD * (trọng số bị prune / tổng trọng số)
+    score_pair(i, j) -> (bản ghi, trọng số)"""
+    side1 = _BlockSide(features1)
+    side2 = _BlockSide(features2)
+    jaccard_share = METRIC_WEIGHTS["jaccard"] / sum(METRIC_WEIGHTS.values())
+    levels = []
+    results = []
+    pruned_blocks = []
+    total_weight = 0.0
+    weighted_sum = 0.0
+    pruned_weight = 0.0
+    block_pruned_pairs = 0
+
+    frontier = [((0, len(features1)), (0, len(features2)))]
+    depth = 0
+    while frontier:
+        level = {"level": depth, "block_pairs": len(frontier), "pruned_block_pairs": 0,
+                 "pruned_segment_pairs": 0, "compared_segment_pairs": 0}
+        next_frontier = []
+        for (i0, i1), (j0, j1) in frontier:
+            df1, df2 = side1.doc_freq(i0, i1), side2.doc_freq(j0, j1)
+            shared_words = df1.keys() & df2.keys()
+            bound_size = max(side1.min_size(i0, i1), side2.min_size(j0, j1))
+            if len(shared_words) < JACCARD_THRESHOLD * bound_size:
+                rows, cols = i1 - i0, j1 - j0
+                level["pruned_block_pairs"] += 1
+                level["pruned_segment_pairs"] += rows * cols
+                block_pruned_pairs += rows * cols
+                pruned_blocks.append(((i0, i1), (j0, j1)))
+
+                intersections = sum(df1[w] * df2[w] for w in shared_words)
+                unions = cols * side1.total_size(i0, i1) + rows * side2.total_size(j0, j1) - intersections
+                block_jaccard = intersections / unions if unions else 0.0
+                weight = (cols * side1.total_length(i0, i1) + rows * side2.total_length(j0, j1)) / 2
+                total_weight += weight
+                pruned_weight += weight
+                weighted_sum += weight * block_jaccard * jaccard_share
+            elif i1 - i0 == 1 and j1 - j0 == 1:
+                level["compared_segment_pairs"] += 1
+                record, weight = score_pair(i0, j0)
+                results.append(record)
+                total_weight += weight
+                weighted_sum += record["weight"] * record["average_score"]
+            else:
+                for rows in _halves(i0, i1):
+                    for cols in _halves(j0, j1):
+                        next_frontier.append((rows, cols))
+        levels.append(level)
+        frontier = next_frontier
+        depth += 1
+
+    # Giữ thứ tự kết quả giống chế độ thường
+    results.sort(key=lambda r: (r["segment1_idx"], r["segment2_idx"]))
+    error_bound = jaccard_share * JACCARD_THRESHOLD * pruned_weight / total_weight if total_weight > 0 else 0.0
+    return {
+        "results": results,
+        "total_weight": total_weight,
+        "weighted_sum": weighted_sum,
+        "block_pruned_pairs": block_pruned_pairs,
+        "pruned_blocks": pruned_blocks,
+        "pruned_score_error_bound": error_bound,
+        "pruning_levels": levels
+    }
+
+def divide_conquer_compare(segments1: List[List[str]], segments2: List[List[str]],
+                           edit_threshold: float = None, mode: str = "flat") -> Dict:
+    """Chiến lược chính với pruning và trọng số nâng cao
+    mode: "flat" so mọi cặp đoạn; "hierarchical" so khối đoạn trước và chỉ đệ quy vào khối có thể giống
+    (khối bị prune được tính gộp, final_similarity lệch chế độ "flat" không quá pruned_score_error_bound)"""
+    if edit_threshold is None:
+        edit_threshold = EDIT_SIMILARITY_THRESHOLD
+    if mode not in ("flat", "hierarchical"):
+        raise ValueError(f"mode không hợp lệ: {mode}")
     start_time = time.time()
     logging.info("Bắt đầu Chia để trị (cải tiến pruning)...")
 
@@ -135,64 +410,70 @@ def divide_conquer_compare(segments1: List[List[str]], segments2: List[List[str]
         logging.error("Segments rỗng.")
         return {"error": "Segments rỗng"}
 
-    results = []
-    total_weight = 0.0
-    pruned_count = 0
-
-    for i, seg1 in enumerate(segments1):
-        for j, seg2 in enumerate(segments2):
-            scores = compare_two_segments(seg1, seg2)
-
-            # Trọng số: trung bình độ dài + TF-IDF (nếu không prune)
-            seg_weight = (len(seg1) + len(seg2)) / 2
-            tfidf_boost = scores.get("tfidf", 0.0) if not scores["pruned"] else 0.0
-            weight = seg_weight + tfidf_boost
-            total_weight += weight
-
-            # Trung bình có trọng số các metric
-            weighted_sum = sum(scores[k] * METRIC_WEIGHTS.get(k, 0.0) for k in METRIC_WEIGHTS)
-            average_score = weighted_sum / sum(METRIC_WEIGHTS.values())
-
-            if scores["pruned"]:
-                pruned_count += 1
-
-            results.append({
-                "segment1_idx": i,
-                "segment2_idx": j,
-                "weight": round(weight, 2),
-                "scores": {k: v for k, v in scores.items() if k not in ["warnings", "str1_preview", "str2_preview", "pruned"]},
-                "average_score": round(average_score, 4),
-                "pruned": scores["pruned"],
-                "warnings": scores.get("warnings", []),
-                "str1_preview": scores.get("str1_preview"),
-                "str2_preview": scores.get("str2_preview")
-            })
+    # IDF dựng một lần trên mọi đoạn của cả 2 văn bản; đặc trưng (kể cả TF-IDF) tính một lần mỗi đoạn
+    df_index = DocumentFrequencyIndex(list(segments1) + list(segments2))
+    features1 = extract_segment_features(segments1, df_index)
+    features2 = extract_segment_features(segments2, df_index)
+
+    def score_pair(i, j):
+        scores = compare_two_segments(segments1[i], segments2[j], edit_threshold=edit_threshold,
+                                      features1=features1[i], features2=features2[j])
+        return _pair_result(i, j, features1[i].length, features2[j].length, scores)
+
+    pruning_levels = None
+    block_pruned_pairs = 0
+    if mode == "hierarchical":
+        tree = hierarchical_compare(features1, features2, score_pair)
+        results = tree["results"]
+        total_weight = tree["total_weight"]
+        weighted_sum_final = tree["weighted_sum"]
+        block_pruned_pairs = tree["block_pruned_pairs"]
+        pruning_levels = tree["pruning_levels"]
+    else:
+        results = []
+        total_weight = 0.0
+        for i in range(len(segments1)):
+            for j in range(len(segments2)):
+                record, weight = score_pair(i, j)
+                results.append(record)
+                total_weight += weight
+        weighted_sum_final = sum(r["weight"] * r["average_score"] for r in results)
+
+    total_pairs = len(segments1) * len(segments2)
+    pruned_count = block_pruned_pairs + sum(1 for r in results if r["pruned"])
 
     # Tổng hợp cuối cùng
-    weighted_sum_final = sum(r["weight"] * r["average_score"] for r in results)
     final_similarity = weighted_sum_final / total_weight if total_weight > 0 else 0.0
 
     elapsed = time.time() - start_time
 
     output = {
         "strategy": "Divide and Conquer (Pruning & Weighted)",
+        "mode": mode,
         "final_similarity": round(final_similarity, 4),
         "final_percentage": f"{round(final_similarity * 100, 2)}%",
         "execution_time_seconds": round(elapsed, 4),
-        "total_pairs": len(results),
+        "total_pairs": total_pairs,
         "pruned_pairs": pruned_count,
         "pruning_threshold": JACCARD_THRESHOLD,
+        "edit_similarity_threshold": edit_threshold,
+        "idf_documents": df_index.num_documents,
         "metric_weights": METRIC_WEIGHTS,
         "comparison_details": results
     }
+    if pruning_levels is not None:
+        output["block_pruned_pairs"] = block_pruned_pairs
+        output["pruned_score_error_bound"] = round(tree["pruned_score_error_bound"], 4)
+        output["pruning_levels"] = pruning_levels
 
     with open("divide_conquer_result.json", "w", encoding="utf-8") as f:
         json.dump(output, f, ensure_ascii=False, indent=4)
 
-    logging.info(f"Hoàn thành. Pruned {pruned_count}/{len(results)} cặp. Kết quả lưu tại divide_conquer_result.json")
+    logging.info(f"Hoàn thành. Pruned {pruned_count}/{total_pairs} cặp. Kết quả lưu tại divide_conquer_result.json")
     return output
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     data = load_segments("segments.json")
     segments1 = data.get("text1_segments", [])
     segments2 = data.get("text2_segments", [])
@@ -201,10 +482,14 @@ if __name__ == "__main__":
         print("Không có đoạn nào. Kiểm tra segmenter.py hoặc segments.json")
         exit(1)
 
-    result = divide_conquer_compare(segments1, segments2)
+    mode = "hierarchical" if "--hierarchical" in sys.argv else "flat"
+    result = divide_conquer_compare(segments1, segments2, mode=mode)
 
     print("\n=== KẾT QUẢ CHIA ĐỂ TRỊ ===")
     print(f"Độ giống tổng thể: {result['final_percentage']}")
     print(f"Thời gian chạy: {result['execution_time_seconds']} giây")
     print(f"Tổng cặp so sánh: {result['total_pairs']}")
     print(f"Số cặp bị pruning: {result['pruned_pairs']} (ngưỡng Jaccard < {result['pruning_threshold']})")
+    for level in result.get("pruning_levels", []):
+        print(f"  Mức {level['level']}: {level['block_pairs']} cặp khối, loại {level['pruned_block_pairs']} khối "
+              f"({level['pruned_segment_pairs']} cặp đoạn), so trực tiếp {level['compared_segment_pairs']} cặp")
@@ -4,8 +4,8 @@ import unicodedata
 import time
 import os
 import sys
-
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from bisect import bisect_left
+from token_vocab import to_words, Vocabulary, TokenDocument
 
 # Chuẩn hóa Unicode - Kiểm tra kiểu dữ liệu , loại bỏ ký tự lạ như ký tự ẩn hoặc khoảng trắng.
 def normalize_unicode(text):
@@ -19,7 +19,10 @@ def normalize_unicode(text):
 def edit_distance_dp(str1, str2):
     str1 = normalize_unicode(str1)
     str2 = normalize_unicode(str2)
-    
+    return levenshtein_dp(str1, str2)
+
+# Quy hoạch động trên hai dãy bất kỳ (chuỗi ký tự hoặc dãy mã số từ), không chuẩn hóa Unicode.
+def levenshtein_dp(str1, str2):
     if not str1:
         return len(str2)
     if not str2:
@@ -43,6 +46,443 @@ def edit_distance_dp(str1, str2):
     
     return previous[-1]
 
+# Edit Distance bit-song song (Myers 1999 / Hyyrö 2001) - dùng số nguyên lớn của Python làm vector bit.
+# Mỗi ký tự của chuỗi dài chỉ tốn vài phép toán bit trên số nguyên m bit: O(ceil(m/w) * n) thay vì O(n * m).
+# Nhận mọi dãy phần tử băm được (chuỗi ký tự, list từ, mảng mã số từ), không chuẩn hóa Unicode.
+def levenshtein_bitparallel(seq1, seq2):
+    # seq1 là chuỗi ngắn hơn (pattern), mỗi phần tử ứng với một bit
+    if len(seq1) > len(seq2):
+        seq1, seq2 = seq2, seq1
+    m = len(seq1)
+    if m == 0:
+        return len(seq2)
+
+    # peq[c]: mặt nạ bit các vị trí của c trong seq1
+    peq = {}
+    for i, c in enumerate(seq1):
+        peq[c] = peq.get(c, 0) | (1 << i)
+
+    full = (1 << m) - 1
+    high = 1 << (m - 1)
+    vp = full   # Các vị trí có hiệu dọc +1
+    vn = 0      # Các vị trí có hiệu dọc -1
+    score = m
+    for c in seq2:
+        eq = peq.get(c, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        hp = vn | (~(xh | vp) & full)
+        hn = vp & xh
+        if hp & high:
+            score += 1
+        elif hn & high:
+            score -= 1
+        # Hàng 0 của bảng DP tăng dần (D[0][j] = j) nên dịch vào bit 1 cho hp
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = hn | (~(xv | hp) & full)
+        vn = hp & xv
+    return score
+
+# Edit Distance bit-song song trên chuỗi (chuẩn hóa Unicode giống edit_distance_dp), kết quả giống hệt.
+def edit_distance_bitparallel(str1, str2):
+    str1 = normalize_unicode(str1)
+    str2 = normalize_unicode(str2)
+    return levenshtein_bitparallel(str1, str2)
+
+# Edit Distance có ngưỡng (Ukkonen): chỉ tính dải chéo rộng 2k+1 quanh đường chéo chính.
+# Trả về khoảng cách nếu <= max_distance, ngược lại trả về None ("vượt quá k") ngay khi
+# mọi ô của một hàng đều > k. Cặp khác nhau nhiều chỉ tốn O(k * n) thay vì O(n * m).
+def levenshtein_banded(seq1, seq2, max_distance):
+    n, m = len(seq1), len(seq2)
+    k = max_distance
+    if k < 0 or abs(n - m) > k:
+        return None
+    if n == 0 or m == 0:
+        return max(n, m)
+
+    inf = k + 1
+    width = 2 * k + 1
+    # Hàng i lưu ở mảng độ rộng 2k+1: chỉ số d ứng với cột j = i - k + d
+    prev = [(d - k) if 0 <= d - k <= m else inf for d in range(width)]
+    for i in range(1, n + 1):
+        c1 = seq1[i - 1]
+        cur = [inf] * width
+        row_min = inf
+        for d in range(width):
+            j = i - k + d
+            if j < 0 or j > m:
+                continue
+            if j == 0:
+                best = i
+            else:
+                # Thay thế: (i-1, j-1) cùng chỉ số d ở hàng trước
+                best = prev[d] + (0 if c1 == seq2[j - 1] else 1)
+                # Chèn: (i, j-1) là ô d-1 của hàng hiện tại
+                if d > 0 and cur[d - 1] + 1 < best:
+                    best = cur[d - 1] + 1
+            # Xóa: (i-1, j) là ô d+1 của hàng trước
+            if d + 1 < width and prev[d + 1] + 1 < best:
+                best = prev[d + 1] + 1
+            if best > inf:
+                best = inf
+            cur[d] = best
+            if best < row_min:
+                row_min = best
+        if row_min > k:
+            return None
+        prev = cur
+
+    dist = prev[m - n + k]
+    return dist if dist <= k else None
+
+# Độ rộng dải (2k+1) tối đa để dùng vòng lặp dải Python; dải rộng hơn thì bản bit-song song
+# (O(n) phép toán số nguyên lớn) nhanh hơn hẳn: với cặp đoạn ~290 ký tự, điểm hòa vốn ở k ~ 8
+BANDED_MAX_WIDTH = 16
+
+# Edit Distance có ngưỡng trên dãy bất kỳ: khoảng cách nếu <= max_distance, ngược lại None.
+# Loại ngay O(1) khi chênh lệch độ dài > k; k nhỏ thì chạy dải Ukkonen (dừng sớm),
+# k lớn thì tính bit-song song rồi so với k.
+def levenshtein_within(seq1, seq2, max_distance):
+    if max_distance < 0 or abs(len(seq1) - len(seq2)) > max_distance:
+        return None
+    if 2 * max_distance + 1 < BANDED_MAX_WIDTH:
+        return levenshtein_banded(seq1, seq2, max_distance)
+    dist = levenshtein_bitparallel(seq1, seq2)
+    return dist if dist <= max_distance else None
+
+# Edit Distance có ngưỡng trên chuỗi (chuẩn hóa Unicode giống edit_distance_dp).
+def edit_distance_banded(str1, str2, max_distance):
+    str1 = normalize_unicode(str1)
+    str2 = normalize_unicode(str2)
+    return levenshtein_within(str1, str2, max_distance)
+
+# Đổi ngưỡng tỉ lệ giống nhau (0.0-1.0) thành khoảng cách tối đa k tương ứng:
+# similarity >= threshold  <=>  edit_dist <= (1 - threshold) * max(len1, len2)
+def similarity_threshold_to_max_distance(threshold, len1, len2):
+    return int((1.0 - threshold) * max(len1, len2) + 1e-9)
+
+# ===== Edit Distance theo neo (anchor) cho cả văn bản - kiểu patience diff =====
+# Độ dài k-gram từ dùng để tìm neo
+ANCHOR_KGRAM = 4
+
+def find_anchors(seq1, seq2, k=ANCHOR_KGRAM):
+    """
+    Tìm các neo khớp chính xác giữa 2 dãy: k-gram xuất hiện đúng một lần ở mỗi dãy,
+    giữ chuỗi neo tăng dần ở cả hai phía (LIS kiểu patience sorting), rồi nối và mở rộng
+    thành các đoạn khớp tối đa không chồng lấn. Trả về [(i, j, độ dài)].
+    """
+    n, m = len(seq1), len(seq2)
+    if k <= 0 or n < k or m < k:
+        return []
+
+    # Băm k-gram, -1 đánh dấu k-gram lặp lại (không dùng làm neo)
+    grams1 = {}
+    for i in range(n - k + 1):
+        key = tuple(seq1[i:i + k])
+        grams1[key] = -1 if key in grams1 else i
+    grams2 = {}
+    for j in range(m - k + 1):
+        key = tuple(seq2[j:j + k])
+        if key in grams1:
+            grams2[key] = -1 if key in grams2 else j
+
+    matches = sorted(
+        (grams1[key], j) for key, j in grams2.items()
+        if j >= 0 and grams1[key] >= 0
+    )
+    if not matches:
+        return []
+
+    # Dãy con tăng dài nhất theo j (patience sorting)
+    tails = []        # j nhỏ nhất kết thúc dãy tăng độ dài t+1
+    tail_idx = []
+    parent = [-1] * len(matches)
+    for idx, (_, j) in enumerate(matches):
+        pos = bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_idx.append(idx)
+        else:
+            tails[pos] = j
+            tail_idx[pos] = idx
+        parent[idx] = tail_idx[pos - 1] if pos > 0 else -1
+    chain = []
+    idx = tail_idx[-1]
+    while idx >= 0:
+        chain.append(matches[idx])
+        idx = parent[idx]
+    chain.reverse()
+
+    # Nối các k-gram liên tiếp cùng đường chéo, mở rộng hai phía, cắt phần chồng lấn
+    anchors = []
+    for i, j in chain:
+        if anchors:
+            pi, pj, plen = anchors[-1]
+            if i - pi == j - pj and i <= pi + plen:
+                anchors[-1] = (pi, pj, max(plen, i + k - pi))
+                continue
+            if i < pi + plen or j < pj + plen:
+                # Neo mới chồng lên neo trước: bỏ phần chồng
+                cut = max(pi + plen - i, pj + plen - j)
+                if cut >= k:
+                    continue
+                i, j = i + cut, j + cut
+                anchors.append((i, j, k - cut))
+                continue
+        anchors.append((i, j, k))
+
+    extended = []
+    for idx, (i, j, length) in enumerate(anchors):
+        lo1, lo2 = (0, 0) if not extended else (extended[-1][0] + extended[-1][2], extended[-1][1] + extended[-1][2])
+        while i > lo1 and j > lo2 and seq1[i - 1] == seq2[j - 1]:
+            i, j, length = i - 1, j - 1, length + 1
+        hi1, hi2 = (n, m) if idx + 1 == len(anchors) else anchors[idx + 1][:2]
+        while i + length < hi1 and j + length < hi2 and seq1[i + length] == seq2[j + length]:
+            length += 1
+        extended.append((i, j, length))
+    return extended
+
+def anchored_levenshtein(seq1, seq2, anchors):
+    # Tổng edit distance của các khoảng trống giữa các neo (phần neo khớp hoàn toàn, chi phí 0)
+    total = 0
+    p1 = p2 = 0
+    for i, j, length in anchors:
+        total += levenshtein_bitparallel(seq1[p1:i], seq2[p2:j])
+        p1, p2 = i + length, j + length
+    total += levenshtein_bitparallel(seq1[p1:], seq2[p2:])
+    return total
+
+def anchored_edit_distance_details(str1, str2, k=ANCHOR_KGRAM):
+    """
+    Edit Distance ký tự cho cả văn bản: tìm neo trên k-gram TỪ, đổi ra vị trí ký tự,
+    rồi chỉ chạy Levenshtein trên các khoảng giữa các neo.
+    Kết quả là cận trên của khoảng cách thật (cận dưới là chênh lệch độ dài);
+    bound = "exact" khi không có neo hoặc hai cận trùng nhau, ngược lại "upper_bound".
+    """
+    str1 = normalize_unicode(str1)
+    str2 = normalize_unicode(str2)
+    words1 = str1.split(' ')
+    words2 = str2.split(' ')
+    starts1 = word_char_starts(words1)
+    starts2 = word_char_starts(words2)
+
+    ids1, ids2 = word_id_sequences(words1, words2)
+    char_anchors = []
+    for i, j, length in find_anchors(ids1, ids2, k):
+        # Các từ khớp giống hệt nhau nên độ dài ký tự của neo ở hai phía bằng nhau
+        end = starts1[i + length - 1] + len(words1[i + length - 1])
+        char_anchors.append((starts1[i], starts2[j], end - starts1[i]))
+
+    distance = anchored_levenshtein(str1, str2, char_anchors)
+    lower_bound = abs(len(str1) - len(str2))
+    exact = not char_anchors or distance == lower_bound
+    return {
+        "distance": distance,
+        "bound": "exact" if exact else "upper_bound",
+        "lower_bound": lower_bound,
+        "anchors": len(char_anchors),
+        "anchored_chars": sum(length for _, _, length in char_anchors)
+    }
+
+def edit_distance_anchored(str1, str2):
+    return anchored_edit_distance_details(str1, str2)["distance"]
+
+# Các cách tính Edit Distance ký tự, chọn bằng tham số method
+EDIT_DISTANCE_METHODS = {
+    "dp": edit_distance_dp,
+    "bitparallel": edit_distance_bitparallel,
+    "anchored": edit_distance_anchored
+}
+DEFAULT_EDIT_METHOD = "bitparallel"
+
+def compute_edit_distance(str1, str2, method=DEFAULT_EDIT_METHOD):
+    if method not in EDIT_DISTANCE_METHODS:
+        raise ValueError(f"Phương pháp Edit Distance không hợp lệ: {method}")
+    return EDIT_DISTANCE_METHODS[method](str1, str2)
+
+# Cùng các phương pháp nhưng cho chuỗi đã qua normalize_unicode (chuẩn hóa một lần, so nhiều lần)
+NORMALIZED_EDIT_DISTANCE_METHODS = {
+    "dp": levenshtein_dp,
+    "bitparallel": levenshtein_bitparallel,
+    "anchored": edit_distance_anchored
+}
+
+def compute_normalized_edit_distance(norm1, norm2, method=DEFAULT_EDIT_METHOD):
+    if method not in NORMALIZED_EDIT_DISTANCE_METHODS:
+        raise ValueError(f"Phương pháp Edit Distance không hợp lệ: {method}")
+    return NORMALIZED_EDIT_DISTANCE_METHODS[method](norm1, norm2)
+
+# Đổi 2 văn bản (list từ hoặc TokenDocument) thành 2 dãy mã số từ dùng chung một bảng từ vựng
+def word_id_sequences(words1, words2):
+    if (isinstance(words1, TokenDocument) and isinstance(words2, TokenDocument)
+            and words1.vocab is words2.vocab):
+        return words1.ids, words2.ids
+    vocab = Vocabulary()
+    return vocab.encode(to_words(words1)), vocab.encode(to_words(words2))
+
+# Edit Distance mức từ: mỗi từ là một ký hiệu (thêm/xóa/thay cả từ), chạy trên mã số nguyên.
+# Số ký hiệu ít hơn khoảng 6 lần so với mức ký tự nên nhanh hơn và sát nghĩa đạo văn hơn.
+def word_edit_distance(words1, words2, method=DEFAULT_EDIT_METHOD):
+    ids1, ids2 = word_id_sequences(words1, words2)
+    if method == "dp":
+        return levenshtein_dp(ids1, ids2)
+    return levenshtein_bitparallel(ids1, ids2)
+
+# ===== Căn chỉnh (alignment) bộ nhớ tuyến tính - Hirschberg =====
+# Bài toán con nhỏ hơn số ô này thì giải thẳng bằng bảng DP đầy đủ có truy vết
+HIRSCHBERG_BASE_CELLS = 4096
+
+# Hàng cuối bảng DP của seq1 với mọi tiền tố của seq2: row[j] = D(seq1, seq2[:j]).
+# Dùng lại vector bit của Myers/Hyyrö: sau mỗi cột j, score chính là D[m][j].
+def levenshtein_last_row(seq1, seq2):
+    m = len(seq1)
+    if m == 0:
+        return list(range(len(seq2) + 1))
+    peq = {}
+    for i, c in enumerate(seq1):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    full = (1 << m) - 1
+    high = 1 << (m - 1)
+    vp, vn, score = full, 0, m
+    row = [m]
+    for c in seq2:
+        eq = peq.get(c, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        hp = vn | (~(xh | vp) & full)
+        hn = vp & xh
+        if hp & high:
+            score += 1
+        elif hn & high:
+            score -= 1
+        hp = ((hp << 1) | 1) & full
+        hn = (hn << 1) & full
+        vp = hn | (~(xv | hp) & full)
+        vn = hp & xv
+        row.append(score)
+    return row
+
+# Bảng DP đầy đủ + truy vết cho bài toán con nhỏ; ghi thao tác vào ops dạng (tag, i, j)
+def _align_full(seq1, seq2, off1, off2, ops):
+    n, m = len(seq1), len(seq2)
+    table = [list(range(m + 1))]
+    for i in range(1, n + 1):
+        prev = table[-1]
+        cur = [i]
+        a = seq1[i - 1]
+        for j in range(1, m + 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (0 if a == seq2[j - 1] else 1)))
+        table.append(cur)
+
+    path = []
+    i, j = n, m
+    while i > 0 or j > 0:
+        if i > 0 and j > 0 and table[i][j] == table[i - 1][j - 1] + (0 if seq1[i - 1] == seq2[j - 1] else 1):
+            path.append(("equal" if seq1[i - 1] == seq2[j - 1] else "replace", i - 1, j - 1))
+            i, j = i - 1, j - 1
+        elif i > 0 and table[i][j] == table[i - 1][j] + 1:
+            path.append(("delete", i - 1, j))
+            i -= 1
+        else:
+            path.append(("insert", i, j - 1))
+            j -= 1
+    for tag, pi, pj in reversed(path):
+        ops.append((tag, off1 + pi, off2 + pj))
+
+def _hirschberg(seq1, seq2, off1, off2, ops):
+    n, m = len(seq1), len(seq2)
+    if n == 0:
+        ops.extend(("insert", off1, off2 + j) for j in range(m))
+        return
+    if m == 0:
+        ops.extend(("delete", off1 + i, off2) for i in range(n))
+        return
+    if n <= 1 or m <= 1 or n * m <= HIRSCHBERG_BASE_CELLS:
+        _align_full(seq1, seq2, off1, off2, ops)
+        return
+
+    # Chia đôi seq1, tìm điểm cắt tối ưu của seq2 từ hai hàng DP xuôi/ngược (chỉ tốn O(m) bộ nhớ)
+    mid = n // 2
+    forward = levenshtein_last_row(seq1[:mid], seq2)
+    backward = levenshtein_last_row(seq1[mid:][::-1], seq2[::-1])
+    split = min(range(m + 1), key=lambda k: forward[k] + backward[m - k])
+
+    _hirschberg(seq1[:mid], seq2[:split], off1, off2, ops)
+    _hirschberg(seq1[mid:], seq2[split:], off1 + mid, off2 + split, ops)
+
+def align_sequences(seq1, seq2):
+    """
+    Căn chỉnh 2 dãy (chuỗi ký tự, list từ, mã số từ) với bộ nhớ tuyến tính.
+    Trả về danh sách đoạn (tag, a_start, a_end, b_start, b_end) giống difflib.get_opcodes(),
+    tag là 'equal', 'replace', 'delete' hoặc 'insert'.
+    """
+    seq1 = list(seq1)
+    seq2 = list(seq2)
+    ops = []
+    _hirschberg(seq1, seq2, 0, 0, ops)
+
+    # Gộp các thao tác liên tiếp cùng loại thành một đoạn
+    spans = []
+    for tag, i, j in ops:
+        di = 0 if tag == "insert" else 1
+        dj = 0 if tag == "delete" else 1
+        if spans and spans[-1][0] == tag and spans[-1][2] == i and spans[-1][4] == j:
+            last = spans[-1]
+            spans[-1] = (tag, last[1], i + di, last[3], j + dj)
+        else:
+            spans.append((tag, i, i + di, j, j + dj))
+    return spans
+
+# Vị trí ký tự bắt đầu của từng từ trong chuỗi ' '.join(words)
+def word_char_starts(words):
+    starts = []
+    pos = 0
+    for w in words:
+        starts.append(pos)
+        pos += len(w) + 1
+    return starts
+
+def source_span(offsets, start, end):
+    # Khoảng ký tự [start, end) trong văn bản gốc của các từ start..end-1 (không rõ thì None, None)
+    if not offsets or end > len(offsets):
+        return None, None
+    first = offsets[start][0]
+    last = offsets[end - 1][1]
+    if first < 0 or last < 0:
+        return None, None
+    return first, last
+
+# Các đoạn văn giống hệt nhau (sao chép) giữa 2 văn bản, căn chỉnh ở mức từ.
+# word_*: vị trí từ trong danh sách từ đã làm sạch; clean_char_*: vị trí ký tự trong ' '.join(words)
+# (văn bản đã chuẩn hóa: chữ thường, đã bỏ stopwords). Nếu có offsets1/offsets2 (cleaned_offsets của
+# preprocess) thì source_start*/source_end* là vị trí ký tự trong văn bản gốc.
+def copied_passages(words1, words2, min_words=5, offsets1=None, offsets2=None):
+    ids1, ids2 = word_id_sequences(words1, words2)
+    words1 = to_words(words1)
+    words2 = to_words(words2)
+    starts1 = word_char_starts(words1)
+    starts2 = word_char_starts(words2)
+
+    passages = []
+    for tag, a0, a1, b0, b1 in align_sequences(ids1, ids2):
+        if tag != "equal" or a1 - a0 < min_words:
+            continue
+        text = ' '.join(words1[a0:a1])
+        source_start1, source_end1 = source_span(offsets1, a0, a1)
+        source_start2, source_end2 = source_span(offsets2, b0, b1)
+        passages.append({
+            "word_start1": a0, "word_end1": a1,
+            "word_start2": b0, "word_end2": b1,
+            "clean_char_start1": starts1[a0], "clean_char_end1": starts1[a0] + len(text),
+            "clean_char_start2": starts2[b0], "clean_char_end2": starts2[b0] + len(text),
+            "source_start1": source_start1, "source_end1": source_end1,
+            "source_start2": source_start2, "source_end2": source_end2,
+            "length_words": a1 - a0,
+            "text": text
+        })
+    return passages
+
 # Chuyển đổi Edit Distance thành tỉ lệ giống nhau (0.0-1.0).
 def edit_distance_to_similarity(edit_dist, len1, len2):
     if max(len1, len2) == 0:
@@ -50,7 +490,9 @@ def edit_distance_to_similarity(edit_dist, len1, len2):
     return 1.0 - (edit_dist / max(len1, len2))
 
 # Hàm chính xử lý Edit Distance - Validation, tính toán, logging, và xuất JSON.
-def process_edit_distance(cleaned_words1, cleaned_words2, output_file='edit_distance_result.json'):
+def process_edit_distance(cleaned_words1, cleaned_words2, output_file='edit_distance_result.json', method=DEFAULT_EDIT_METHOD,
+                          word_level=True, align=False, min_passage_words=5, offsets1=None, offsets2=None):
+    # offsets1/offsets2: cleaned_offsets của preprocess, để đổi các đoạn sao chép về vị trí trong văn bản gốc
     start_time = time.time()
     logging.info("Bắt đầu xử lý Edit Distance.")
     
@@ -60,34 +502,64 @@ def process_edit_distance(cleaned_words1, cleaned_words2, output_file='edit_dist
     if not cleaned_words2 or len(cleaned_words2) < 5:
         warnings.append("text2: rỗng hoặc quá ngắn (<5 từ)")
     
-    str1 = ' '.join(cleaned_words1)
-    str2 = ' '.join(cleaned_words2)
+    str1 = ' '.join(to_words(cleaned_words1))
+    str2 = ' '.join(to_words(cleaned_words2))
     
     len1, len2 = len(str1), len(str2)
     logging.info(f"Độ dài chuỗi 1: {len1}, Chuỗi 2: {len2}")
     
-    edit_dist = edit_distance_dp(str1, str2)
-    logging.info(f"Edit Distance: {edit_dist}")
+    # Chế độ neo chỉ cho cận trên; các chế độ còn lại là chính xác
+    bound_info = {"bound": "exact"}
+    if method == "anchored":
+        bound_info = anchored_edit_distance_details(str1, str2)
+        edit_dist = bound_info["distance"]
+    else:
+        edit_dist = compute_edit_distance(str1, str2, method)
+    logging.info(f"Edit Distance ({method}, {bound_info['bound']}): {edit_dist}")
     
     similarity = edit_distance_to_similarity(edit_dist, len1, len2)
     logging.info(f"Tỉ lệ giống nhau: {similarity:.4f}")
+
+    # Edit Distance mức từ, báo cáo song song với mức ký tự
+    word_dist = None
+    word_similarity = None
+    if word_level:
+        word_dist = word_edit_distance(cleaned_words1, cleaned_words2, method)
+        word_similarity = edit_distance_to_similarity(word_dist, len(cleaned_words1), len(cleaned_words2))
+        logging.info(f"Edit Distance mức từ: {word_dist}, tỉ lệ giống nhau: {word_similarity:.4f}")
+
+    # Căn chỉnh Hirschberg (bộ nhớ tuyến tính) để chỉ ra các đoạn bị sao chép
+    passages = None
+    if align:
+        passages = copied_passages(cleaned_words1, cleaned_words2, min_passage_words, offsets1, offsets2)
+        logging.info(f"Tìm thấy {len(passages)} đoạn trùng khớp >= {min_passage_words} từ")
     
     elapsed = time.time() - start_time
     
     result = {
         "strategy": "Edit Distance (Levenshtein DP)",
         "edit_distance": edit_dist,
+        "edit_distance_bound": bound_info["bound"],
         "similarity_ratio": round(similarity, 4),
         "similarity_percentage": f"{round(similarity * 100, 2)}%",
+        "word_edit_distance": word_dist,
+        "word_similarity_ratio": round(word_similarity, 4) if word_similarity is not None else None,
         "time_seconds": round(elapsed, 4),
         "details": {
+            "method": method,
+            "edit_distance_lower_bound": bound_info.get("lower_bound"),
+            "anchors": bound_info.get("anchors"),
             "len_str1": len1,
             "len_str2": len2,
+            "word_count1": len(cleaned_words1),
+            "word_count2": len(cleaned_words2),
             "str1_preview": str1[:100] + '...' if len(str1) > 100 else str1,  # Preview để debug
             "str2_preview": str2[:100] + '...' if len(str2) > 100 else str2,  # Preview để debug
             "warnings": warnings
         }
     }
+    if passages is not None:
+        result["details"]["copied_passages"] = passages
     
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(result, f, ensure_ascii=False, indent=4)
@@ -104,8 +576,23 @@ def load_input_from_json(input_file='preprocessed_data.json'):
         data = json.load(f)
     return data.get('text1', {}).get('cleaned_words', []), data.get('text2', {}).get('cleaned_words', [])
 
+# Đọc input từ corpus nhị phân (memory-map), nhanh hơn JSON với dữ liệu lớn.
+def load_input_from_store(input_file='preprocessed_data.bin'):
+    from corpus_store import open_corpus
+    if not os.path.exists(input_file):
+        logging.error(f"Không tìm thấy {input_file}. Chạy preprocess_text.py trước!")
+        sys.exit(1)
+    store = open_corpus(input_file)
+    if 'text1' not in store.names or 'text2' not in store.names:
+        return [], []
+    return store.document_by_name('text1'), store.document_by_name('text2')
+
 if __name__ == "__main__":
-    cleaned1, cleaned2 = load_input_from_json()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if os.path.exists('preprocessed_data.bin'):
+        cleaned1, cleaned2 = load_input_from_store()
+    else:
+        cleaned1, cleaned2 = load_input_from_json()
     result = process_edit_distance(cleaned1, cleaned2)
     print(f"Edit Distance: {result['edit_distance']}")
     print(f"Tỉ lệ giống nhau: {result['similarity_percentage']}")
@@ -0,0 +1,247 @@
+# Chiến lược Fingerprint: băm cuộn Rabin-Karp trên k-gram từ + chọn lọc Winnowing (kiểu MOSS)
+# Mỗi văn bản chỉ giữ một tập nhỏ fingerprint 64-bit (kèm vị trí) nên so sánh với cả một
+# cơ sở dữ liệu fingerprint lớn được, và ánh xạ ngược được các fingerprint trùng về đoạn văn.
+import time
+from collections import deque
+
+from similarity_jaccard import stable_token_hash
+from token_vocab import TokenDocument, to_words
+
+WINNOW_KGRAM = 5      # Số từ trong mỗi k-gram
+WINNOW_WINDOW = 4     # Số k-gram trong mỗi cửa sổ winnowing
+
+MASK64 = (1 << 64) - 1
+HASH_BASE = 0x100000001B3   # Cơ số băm cuộn (mod 2^64)
+
+def _mix64(x):
+    # Trộn bit (splitmix64) để giá trị băm phân bố đều, giúp chọn min trong cửa sổ ngẫu nhiên hơn
+    x = (x ^ (x >> 30)) * 0xBF58476D1CE4E5B9 & MASK64
+    x = (x ^ (x >> 27)) * 0x94D049BB133111EB & MASK64
+    return x ^ (x >> 31)
+
+def token_values(words):
+    # Giá trị số của từng từ: hash ổn định của chuỗi từ (TokenDocument được giải mã qua vocab của nó)
+    # Không dùng mã số của vocab vì mã chỉ có nghĩa trong một Vocabulary; hash của chuỗi thì
+    # giống nhau giữa các Vocabulary, process và lần chạy, nên fingerprint lưu lại dùng được lâu dài
+    if isinstance(words, TokenDocument):
+        token = words.vocab.token
+        items = words.ids
+    else:
+        token = None
+        items = words
+
+    hashes = {}   # Mỗi từ phân biệt chỉ băm một lần
+    values = []
+    for item in items:
+        h = hashes.get(item)
+        if h is None:
+            h = hashes[item] = stable_token_hash(token(item) if token else item)
+        values.append(h)
+    return values
+
+def kgram_hashes(values, k=WINNOW_KGRAM):
+    # Băm cuộn Rabin-Karp: hash của k-gram kế tiếp tính O(1) từ k-gram trước
+    n = len(values)
+    if n < k:
+        return []
+    top = pow(HASH_BASE, k - 1, 1 << 64)
+    h = 0
+    for x in values[:k]:
+        h = (h * HASH_BASE + x) & MASK64
+    hashes = [_mix64(h)]
+    for i in range(k, n):
+        h = ((h - values[i - k] * top) * HASH_BASE + values[i]) & MASK64
+        hashes.append(_mix64(h))
+    return hashes
+
+def winnow(hashes, w=WINNOW_WINDOW):
+    """
+    Chọn fingerprint: trong mỗi cửa sổ w hash liên tiếp lấy hash nhỏ nhất (nếu bằng nhau lấy
+    cái bên phải nhất), chỉ ghi lại khi vị trí được chọn thay đổi.
+    Trả về [(hash, vị trí k-gram)]. Dùng hàng đợi đơn điệu nên O(n).
+    """
+    if not hashes:
+        return []
+    if len(hashes) <= w:
+        pos = min(range(len(hashes)), key=lambda i: (hashes[i], -i))
+        return [(hashes[pos], pos)]
+
+    fingerprints = []
+    window = deque()   # Chỉ số các hash tăng dần theo giá trị
+    last = -1
+    for i, h in enumerate(hashes):
+        while window and hashes[window[-1]] >= h:
+            window.pop()
+        window.append(i)
+        if window[0] <= i - w:
+            window.popleft()
+        if i >= w - 1 and window[0] != last:
+            last = window[0]
+            fingerprints.append((hashes[last], last))
+    return fingerprints
+
+def fingerprint(words, k=WINNOW_KGRAM, w=WINNOW_WINDOW):
+    # Fingerprint của một văn bản: [(hash 64-bit, vị trí từ bắt đầu k-gram)]
+    return winnow(kgram_hashes(token_values(words), k), w)
+
+def _positions_by_hash(fingerprints):
+    index = {}
+    for h, pos in fingerprints:
+        index.setdefault(h, []).append(pos)
+    return index
+
+def merge_ranges(ranges):
+    # Gộp các khoảng [start, end) chồng lấn hoặc kề nhau
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+def matched_passages(fp1, fp2, k=WINNOW_KGRAM):
+    # Ánh xạ fingerprint trùng về các đoạn từ [start, end) trong mỗi văn bản
+    index2 = _positions_by_hash(fp2)
+    ranges1 = []
+    ranges2 = []
+    for h, pos in fp1:
+        if h in index2:
+            ranges1.append((pos, pos + k))
+            ranges2.extend((p, p + k) for p in index2[h])
+    return merge_ranges(ranges1), merge_ranges(ranges2)
+
+def compare_fingerprints(fp1, fp2):
+    # Độ trùng fingerprint: Jaccard và tỉ lệ bao phủ của mỗi văn bản
+    h1 = {h for h, _ in fp1}
+    h2 = {h for h, _ in fp2}
+    if not h1 or not h2:
+        return {"jaccard": 0.0, "containment1": 0.0, "containment2": 0.0, "shared": 0}
+    shared = len(h1 & h2)
+    return {
+        "jaccard": shared / len(h1 | h2),
+        "containment1": shared / len(h1),   # Phần của văn bản 1 xuất hiện trong văn bản 2
+        "containment2": shared / len(h2),
+        "shared": shared
+    }
+
+
+class FingerprintDatabase:
+    """
+    Cơ sở dữ liệu fingerprint: chỉ mục ngược hash -> [(mã văn bản, vị trí)].
+    Truy vấn chỉ chạm tới các văn bản có fingerprint chung, không duyệt toàn bộ corpus.
+    """
+
+    def __init__(self, k=WINNOW_KGRAM, w=WINNOW_WINDOW):
+        self.k = k
+        self.w = w
+        self.index = {}
+        self.sizes = {}
+
+    def add(self, doc_id, words=None, fingerprints=None):
+        if fingerprints is None:
+            fingerprints = fingerprint(words, self.k, self.w)
+        for h, pos in fingerprints:
+            self.index.setdefault(h, []).append((doc_id, pos))
+        self.sizes[doc_id] = len({h for h, _ in fingerprints})
+        return fingerprints
+
+    def query(self, words=None, fingerprints=None, min_shared=1):
+        """
+        Trả về danh sách văn bản trùng, giảm dần theo tỉ lệ fingerprint của truy vấn tìm thấy:
+        [{"doc_id", "shared", "containment", "matches": [(vị trí truy vấn, vị trí trong văn bản)]}]
+        """
+        if fingerprints is None:
+            fingerprints = fingerprint(words, self.k, self.w)
+        query_size = len({h for h, _ in fingerprints})
+        if not query_size:
+            return []
+
+        shared = {}
+        matches = {}
+        seen = set()
+        for h, qpos in fingerprints:
+            for doc_id, pos in self.index.get(h, ()):
+                matches.setdefault(doc_id, []).append((qpos, pos))
+                if (h, doc_id) not in seen:
+                    seen.add((h, doc_id))
+                    shared[doc_id] = shared.get(doc_id, 0) + 1
+
+        results = [
+            {
+                "doc_id": doc_id,
+                "shared": count,
+                "containment": count / query_size,
+                "matches": matches[doc_id]
+            }
+            for doc_id, count in shared.items() if count >= min_shared
+        ]
+        return sorted(results, key=lambda r: r["containment"], reverse=True)
+
+    def __len__(self):
+        return len(self.sizes)
+
+
+def compare_winnowing(words1, words2, k=WINNOW_KGRAM, w=WINNOW_WINDOW):
+    # Hàm chính: so sánh 2 văn bản bằng fingerprint winnowing
+    start = time.time()
+
+    warnings = []
+    if len(words1) < k:
+        warnings.append(f"Văn bản 1 ngắn hơn {k} từ")
+    if len(words2) < k:
+        warnings.append(f"Văn bản 2 ngắn hơn {k} từ")
+
+    fp1 = fingerprint(words1, k, w)
+    fp2 = fingerprint(words2, k, w)
+    overlap = compare_fingerprints(fp1, fp2)
+    passages1, passages2 = matched_passages(fp1, fp2, k)
+
+    plain1 = to_words(words1)
+    top_passages = sorted(passages1, key=lambda r: r[1] - r[0], reverse=True)[:5]
+
+    elapsed = time.time() - start
+
+    return {
+        "strategy": "Winnowing Fingerprint",
+        "similarity_score": overlap["jaccard"],
+        "time_seconds": elapsed,
+        "details": {
+            "kgram": k,
+            "window": w,
+            "fingerprints_text1": len(fp1),
+            "fingerprints_text2": len(fp2),
+            "shared_fingerprints": overlap["shared"],
+            "containment_text1": overlap["containment1"],
+            "containment_text2": overlap["containment2"],
+            "matched_words_text1": sum(e - s for s, e in passages1),
+            "matched_words_text2": sum(e - s for s, e in passages2),
+            "top_passages": [
+                {"word_start": s, "word_end": e, "text": " ".join(plain1[s:e])}
+                for s, e in top_passages
+            ],
+            "warnings": warnings
+        }
+    }
+
+
+if __name__ == "__main__":
+    import json
+    from preprocess_text import preprocess
+
+    print("Đang so sánh bằng Winnowing Fingerprint...")
+
+    data1 = preprocess("text1.txt", enable_logging=False)
+    data2 = preprocess("text2.txt", enable_logging=False)
+
+    result = compare_winnowing(data1["cleaned"], data2["cleaned"])
+
+    with open("winnowing_result.json", "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print("Độ giống (Jaccard fingerprint):", round(result["similarity_score"], 4))
+    print("Tỉ lệ văn bản 1 có trong văn bản 2:", round(result["details"]["containment_text1"], 4))
+    print("Thời gian:", result["time_seconds"], "giây")
+    print("Các đoạn trùng dài nhất:")
+    for p in result["details"]["top_passages"]:
+        print(f"  - từ {p['word_start']}-{p['word_end']}: {p['text'][:80]}")
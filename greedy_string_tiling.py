@@ -0,0 +1,170 @@
+# Chiến lược Greedy String Tiling (Running Karp-Rabin, Wise 1996)
+# Phủ hai văn bản bằng các "tile" - đoạn trùng nguyên văn không chồng lấn, dài >= min_match_length,
+# ưu tiên đoạn dài trước. Không phụ thuộc thứ tự đoạn nên chịu được việc đảo vị trí các đoạn văn.
+import time
+
+from fingerprint_winnowing import kgram_hashes, token_values
+from token_vocab import to_words
+
+MIN_MATCH_LENGTH = 5       # Độ dài tối thiểu (số từ) của một tile
+INITIAL_SEARCH_LENGTH = 20 # Độ dài cửa sổ băm ở vòng quét đầu tiên
+
+def _free_runs(marked):
+    # runs[i] = số phần tử chưa đánh dấu liên tiếp bắt đầu từ vị trí i
+    runs = [0] * (len(marked) + 1)
+    for i in range(len(marked) - 1, -1, -1):
+        runs[i] = 0 if marked[i] else runs[i + 1] + 1
+    return runs
+
+def _scan_pattern(a, b, marked_a, marked_b, s, hashes_a, hashes_b):
+    """
+    Tìm các đoạn trùng cực đại dài >= s chỉ gồm phần tử chưa đánh dấu
+    Băm mọi cửa sổ s phần tử của b vào bảng, rồi tra từng cửa sổ của a
+    Trả về (danh sách (i, j, độ dài), độ dài lớn nhất)
+    """
+    runs_a = _free_runs(marked_a)
+    runs_b = _free_runs(marked_b)
+
+    table = {}
+    for j, h in enumerate(hashes_b):
+        if runs_b[j] >= s:
+            table.setdefault(h, []).append(j)
+
+    matches = []
+    longest = 0
+    i = 0
+    n = len(hashes_a)
+    while i < n:
+        if runs_a[i] < s:
+            # Mọi cửa sổ bắt đầu trước phần tử đã đánh dấu kế tiếp đều chứa nó
+            i += runs_a[i] + 1
+            continue
+        for j in table.get(hashes_a[i], ()):
+            # Bỏ qua đoạn còn kéo dài được sang trái: đoạn bắt đầu sớm hơn đã được ghi nhận
+            if i and j and a[i - 1] == b[j - 1] and not marked_a[i - 1] and not marked_b[j - 1]:
+                continue
+            if a[i:i + s] != b[j:j + s]:
+                continue   # Trùng hash nhưng khác nội dung
+            k = s
+            limit = min(runs_a[i], runs_b[j])
+            while k < limit and a[i + k] == b[j + k]:
+                k += 1
+            matches.append((i, j, k))
+            if k > longest:
+                longest = k
+        i += 1
+    return matches, longest
+
+def _mark_strings(matches, marked_a, marked_b, tiles):
+    # Đánh dấu các đoạn từ dài đến ngắn; đoạn chạm phần đã đánh dấu bị bỏ (bị che)
+    occluded = 0
+    for i, j, k in sorted(matches, key=lambda m: m[2], reverse=True):
+        if any(marked_a[i:i + k]) or any(marked_b[j:j + k]):
+            occluded += 1
+            continue
+        marked_a[i:i + k] = b"\1" * k
+        marked_b[j:j + k] = b"\1" * k
+        tiles.append((i, j, k))
+    return occluded
+
+def greedy_string_tiling(seq_a, seq_b, min_match_length=MIN_MATCH_LENGTH,
+                         initial_search_length=INITIAL_SEARCH_LENGTH):
+    """
+    RKR-GST trên dãy từ (list[str] hoặc TokenDocument, không cần chung vocab)
+    Trả về (danh sách tile (start_a, start_b, độ dài), số vòng quét)
+    """
+    a = token_values(seq_a)
+    b = token_values(seq_b)
+    marked_a = bytearray(len(a))
+    marked_b = bytearray(len(b))
+    hash_cache = {}   # Hash cửa sổ không phụ thuộc phần đánh dấu nên tính một lần cho mỗi s
+
+    def hashes(s):
+        if s not in hash_cache:
+            hash_cache[s] = (kgram_hashes(a, s), kgram_hashes(b, s))
+        return hash_cache[s]
+
+    tiles = []
+    s = max(initial_search_length, min_match_length)
+    rounds = 0
+    while True:
+        rounds += 1
+        hashes_a, hashes_b = hashes(s)
+        matches, longest = _scan_pattern(a, b, marked_a, marked_b, s, hashes_a, hashes_b)
+        if longest > 2 * s:
+            # Có đoạn rất dài: quét lại với cửa sổ lớn hơn để ghi nhận nó trước
+            s = longest
+            continue
+
+        added = len(tiles)
+        occluded = _mark_strings(matches, marked_a, marked_b, tiles)
+        if occluded and len(tiles) > added:
+            # Phần đánh dấu mới làm lộ ra đoạn cực đại mới ở cùng độ dài cửa sổ
+            continue
+        if s > 2 * min_match_length:
+            s //= 2
+        elif s > min_match_length:
+            s = min_match_length
+        else:
+            break
+    return tiles, rounds
+
+def compare_greedy_tiling(words1, words2, min_match_length=MIN_MATCH_LENGTH, max_report=10):
+    """
+    Hàm chính: so sánh 2 văn bản bằng Greedy String Tiling
+    Độ giống = 2 * (tổng độ dài các tile) / (số từ văn bản 1 + số từ văn bản 2)
+    """
+    start = time.time()
+
+    tiles, rounds = greedy_string_tiling(words1, words2, min_match_length)
+
+    coverage = sum(k for _, _, k in tiles)
+    total = len(words1) + len(words2)
+    score = 2 * coverage / total if total else 0.0
+
+    plain1 = to_words(words1)
+    longest = sorted(tiles, key=lambda t: t[2], reverse=True)[:max_report]
+
+    elapsed = time.time() - start
+
+    return {
+        "strategy": "Greedy String Tiling (RKR-GST)",
+        "similarity_score": score,
+        "time_seconds": elapsed,
+        "details": {
+            "min_match_length": min_match_length,
+            "tile_count": len(tiles),
+            "tiled_words": coverage,
+            "scan_rounds": rounds,
+            "tiles": [
+                {
+                    "start1": i,
+                    "start2": j,
+                    "length": k,
+                    "text": " ".join(plain1[i:i + k])
+                }
+                for i, j, k in longest
+            ]
+        }
+    }
+
+
+if __name__ == "__main__":
+    import json
+    from preprocess_text import preprocess
+
+    print("Đang so sánh bằng Greedy String Tiling...")
+
+    data1 = preprocess("text1.txt", enable_logging=False)
+    data2 = preprocess("text2.txt", enable_logging=False)
+
+    result = compare_greedy_tiling(data1["cleaned"], data2["cleaned"])
+
+    with open("greedy_tiling_result.json", "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print("Độ giống (tỉ lệ phủ tile):", round(result["similarity_score"], 4))
+    print("Số tile:", result["details"]["tile_count"])
+    print("Thời gian:", result["time_seconds"], "giây")
+    for t in result["details"]["tiles"]:
+        print(f"  - {t['length']} từ (vb1 @{t['start1']}, vb2 @{t['start2']}): {t['text'][:80]}")
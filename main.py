@@ -1,6 +1,6 @@
 import os
 import sys
-import webbrowser
+import logging
 
 # Import các module xử lý và so sánh văn bản
 from preprocess_text import preprocess
@@ -10,6 +10,9 @@ from segmenter import segment_by_length
 from bruteforce_match import bruteforce_match
 from edit_distance_dp import process_edit_distance
 from divide_conquer_compare import divide_conquer_compare
+from fingerprint_winnowing import compare_winnowing
+from suffix_automaton_match import compare_suffix_automaton
+from greedy_string_tiling import compare_greedy_tiling
 from report_builder import generate_html_report
 
 # Kiểm tra file đầu vào
@@ -25,7 +28,8 @@ def validate_input(file1, file2):
     return errors
 
 # So sánh 2 file văn bản với tất cả chiến lược
-def compare_texts(file1, file2):
+# workers: số process cho Bruteforce (mặc định None = tuần tự)
+def compare_texts(file1, file2, workers=None):
     errors = validate_input(file1, file2)
     if errors:
         for e in errors:
@@ -61,7 +65,7 @@ def compare_texts(file1, file2):
         seg1 = segment_by_length(words1, 50)
         seg2 = segment_by_length(words2, 50)
         if seg1 and seg2:
-            cos = compare_segments_cosine(seg1, seg2)
+            cos = compare_segments_cosine(seg1, seg2, top_k=5)
             best_score = cos["results"][0]["cosine_score"] if cos["results"] else 0
             results.append({
                 "strategy": cos["strategy"],
@@ -74,7 +78,7 @@ def compare_texts(file1, file2):
 
     # === Bruteforce ===
     try:
-        bf = bruteforce_match(words1, words2, threshold=0.6)
+        bf = bruteforce_match(words1, words2, threshold=0.6, workers=workers)
         results.append({
             "strategy": bf["strategy"],
             "similarity_score": bf["similarity_score"],
@@ -86,7 +90,8 @@ def compare_texts(file1, file2):
 
     # === Edit Distance ===
     try:
-        ed = process_edit_distance(words1, words2, output_file="__tmp_edit_main.json")
+        ed = process_edit_distance(words1, words2, output_file="__tmp_edit_main.json", align=True,
+                                   offsets1=data1.get("cleaned_offsets"), offsets2=data2.get("cleaned_offsets"))
         results.append({
             "strategy": ed["strategy"],
             "similarity_score": ed["similarity_ratio"],
@@ -112,12 +117,58 @@ def compare_texts(file1, file2):
     except:
         pass
 
+    # === Winnowing Fingerprint ===
+    try:
+        wn = compare_winnowing(words1, words2)
+        results.append({
+            "strategy": wn["strategy"],
+            "similarity_score": wn["similarity_score"],
+            "time_seconds": wn["time_seconds"],
+            "details": wn.get("details", {})
+        })
+    except:
+        pass
+
+    # === Suffix Automaton ===
+    try:
+        sa = compare_suffix_automaton(words1, words2)
+        results.append({
+            "strategy": sa["strategy"],
+            "similarity_score": sa["similarity_score"],
+            "time_seconds": sa["time_seconds"],
+            "details": sa.get("details", {})
+        })
+    except:
+        pass
+
+    # === Greedy String Tiling ===
+    try:
+        gst = compare_greedy_tiling(words1, words2)
+        results.append({
+            "strategy": gst["strategy"],
+            "similarity_score": gst["similarity_score"],
+            "time_seconds": gst["time_seconds"],
+            "details": gst.get("details", {})
+        })
+    except:
+        pass
+
     return results
 
 if __name__ == "__main__":
-    if len(sys.argv) >= 3:
-        file1 = sys.argv[1]
-        file2 = sys.argv[2]
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    # Cách dùng: python main.py [file1 file2] [--workers N]
+    args = sys.argv[1:]
+    workers = None
+    if "--workers" in args:
+        idx = args.index("--workers")
+        workers = int(args[idx + 1])
+        del args[idx:idx + 2]
+
+    if len(args) >= 2:
+        file1 = args[0]
+        file2 = args[1]
     else:
         file1 = "text1.txt"
         file2 = "text2.txt"
@@ -125,7 +176,7 @@ if __name__ == "__main__":
             print("Cần có text1.txt và text2.txt hoặc truyền file khi chạy")
             sys.exit(1)
 
-    results = compare_texts(file1, file2)
+    results = compare_texts(file1, file2, workers=workers)
 
     if results:
         try:
@@ -139,6 +190,7 @@ if __name__ == "__main__":
             generate_html_report(all_cases)
             print("Báo cáo HTML: report.html")
 
+            import webbrowser
             report_path = os.path.abspath("report.html")
             webbrowser.open("file://" + report_path)
 
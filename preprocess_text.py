@@ -1,8 +1,10 @@
 import re
 import os
-from underthesea import word_tokenize
-import chardet
+import json
+import hashlib
+import time
 import logging
+from token_vocab import encode_document
 
 # Danh sách từ dừng tiếng Việt
 STOPWORDS_VI = {'và', 'của', 'có', 'được', 'trong', 'là', 'với', 'để', 'cho', 'từ',
@@ -18,13 +20,30 @@ STOPWORDS_EN = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'f
 
 STOPWORDS = STOPWORDS_VI | STOPWORDS_EN
 
-def detect_encoding(file_path):
-    # Phát hiện encoding của file
+# underthesea (nạp model) và chardet import rất chậm nên chỉ import khi thực sự cần
+_word_tokenize = None
+
+def get_word_tokenize():
+    # Trả về hàm word_tokenize của underthesea, import ở lần gọi đầu tiên
+    global _word_tokenize
+    if _word_tokenize is None:
+        from underthesea import word_tokenize
+        _word_tokenize = word_tokenize
+    return _word_tokenize
+
+# Chế độ streaming: số byte đầu file dùng để đoán encoding và kích thước mỗi khối (ký tự)
+ENCODING_SAMPLE_BYTES = 64 * 1024
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+def detect_encoding(file_path, sample_size=None):
+    # Phát hiện encoding của file (sample_size: chỉ đọc từng ấy byte đầu file)
     with open(file_path, 'rb') as f:
-        result = chardet.detect(f.read())
-        return result['encoding'] if result['confidence'] > 0.7 else 'utf-8'
+        data = f.read(sample_size) if sample_size else f.read()
+    import chardet
+    result = chardet.detect(data)
+    return result['encoding'] if result['confidence'] > 0.7 else 'utf-8'
 
-def read_file(file_path):
+def check_file(file_path):
     # Kiểm tra file có tồn tại không
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"Không tìm thấy file: {file_path}")
@@ -32,6 +51,9 @@ def read_file(file_path):
     # Kiểm tra file có rỗng không
     if os.path.getsize(file_path) == 0:
         raise ValueError(f"File rỗng: {file_path}")
+
+def read_file(file_path):
+    check_file(file_path)
     
     encoding = detect_encoding(file_path)
     
@@ -60,6 +82,7 @@ def clean_text_for_segmenter(text):
 
 def tokenize(text):
     # Tách từ (hỗ trợ tiếng Việt)
+    word_tokenize = get_word_tokenize()
     try:
         words = word_tokenize(text, format="text").split()
         return words
@@ -68,59 +91,175 @@ def tokenize(text):
 
 def tokenize_with_punctuation(text):
     # Tách từ nhưng giữ lại dấu câu . ! ? cho segmenter
+    word_tokenize = get_word_tokenize()
     try:
         # Tách từ bằng underthesea
         words = word_tokenize(text, format="text").split()
         # Giữ lại các dấu câu như các token riêng biệt
-        result = []
-        for word in words:
-            # Nếu từ kết thúc bằng dấu câu, tách ra
-            if word and word[-1] in '.!?':
-                result.append(word[:-1])  # Từ không có dấu câu
-                result.append(word[-1])   # Dấu câu riêng
-            else:
-                result.append(word)
-        return result
+        return split_trailing_punctuation(words)
     except:
         # Fallback: tách đơn giản nhưng giữ dấu câu
-        words = []
-        current_word = ""
-        for char in text:
-            if char.isalnum() or char in 'àáạảãâầấậẩẫăằắặẳẵèéẹẻẽêềếệểễìíịỉĩòóọỏõôồốộổỗơờớợởỡùúụủũưừứựửữỳýỵỷỹđ':
-                current_word += char
-            elif char in '.!?':
-                if current_word:
-                    words.append(current_word)
-                    current_word = ""
-                words.append(char)
-            elif char.isspace():
-                if current_word:
-                    words.append(current_word)
-                    current_word = ""
-            else:
-                if current_word:
-                    words.append(current_word)
-                    current_word = ""
-        if current_word:
-            words.append(current_word)
-        return [w for w in words if w.strip()]
+        return simple_tokenize_with_punctuation(text)
+
+def simple_tokenize_with_punctuation(text):
+    # Tách từ đơn giản theo ký tự (không dùng underthesea), giữ dấu câu . ! ?
+    words = []
+    current_word = ""
+    for char in text:
+        if char.isalnum() or char in 'àáạảãâầấậẩẫăằắặẳẵèéẹẻẽêềếệểễìíịỉĩòóọỏõôồốộổỗơờớợởỡùúụủũưừứựửữỳýỵỷỹđ':
+            current_word += char
+        elif char in '.!?':
+            if current_word:
+                words.append(current_word)
+                current_word = ""
+            words.append(char)
+        elif char.isspace():
+            if current_word:
+                words.append(current_word)
+                current_word = ""
+        else:
+            if current_word:
+                words.append(current_word)
+                current_word = ""
+    if current_word:
+        words.append(current_word)
+    return [w for w in words if w.strip()]
+
+def split_trailing_punctuation(words):
+    # Nếu từ kết thúc bằng dấu câu . ! ? thì tách dấu câu thành token riêng
+    result = []
+    for word in words:
+        if word and word[-1] in '.!?':
+            result.append(word[:-1])  # Từ không có dấu câu
+            result.append(word[-1])   # Dấu câu riêng
+        else:
+            result.append(word)
+    return result
+
+def clean_token(token):
+    # Làm sạch một token giống clean_text: chữ thường, bỏ ký tự đặc biệt (giữ . ! ?)
+    return re.sub(r'[^\w\s.!?]', ' ', token.lower()).split()
+
+# Khoảng ký tự tối đa dò tìm token trong text gốc khi tính offset
+OFFSET_SEARCH_WINDOW = 64
+
+def locate_token(token, text, pos):
+    # Tìm vị trí (start, end) của token trong text gốc, bắt đầu dò từ pos
+    surface = token.replace('_', ' ')
+    start = text.find(surface, pos, pos + len(surface) + OFFSET_SEARCH_WINDOW)
+    if start >= 0:
+        return start, start + len(surface)
+
+    # Không khớp nguyên văn (nhiều khoảng trắng, tokenizer chuẩn hóa dấu...): dò từng ký tự
+    n = len(text)
+    i = pos
+    while i < n and text[i].isspace():
+        i += 1
+    start = i
+    for ch in token:
+        if i >= n:
+            return -1, -1
+        if ch == '_' and text[i] != '_':
+            # Dấu nối âm tiết của underthesea tương ứng với khoảng trắng trong text gốc
+            while i < n and text[i].isspace():
+                i += 1
+        else:
+            i += 1
+    return start, i
+
+def token_offsets(tokens, text):
+    # Tính offset [start, end] của từng token trong text gốc (không thấy thì [-1, -1])
+    offsets = []
+    pos = 0
+    for token in tokens:
+        start, end = locate_token(token, text, pos)
+        if start >= 0:
+            pos = end
+        offsets.append([start, end])
+    return offsets
+
+def piece_offsets(pieces, start, end, original_text):
+    # Offset [start, end] trong original_text của các phần clean_token tách ra từ một token
+    # nằm ở [start, end]; phần nào không dò được thì lấy cả span của token
+    if start < 0 or len(pieces) == 1:
+        return [[start, end] for _ in pieces]
+    span = original_text[start:end].lower()
+    offsets = []
+    pos = 0
+    for piece in pieces:
+        i = span.find(piece.replace('_', ' '), pos)
+        if i < 0:
+            offsets.append([start, end])
+            continue
+        offsets.append([start + i, start + i + len(piece)])
+        pos = i + len(piece)
+    return offsets
+
+def tokenize_single_pass(text, original_text=None):
+    # Tách từ MỘT lần bằng underthesea, sinh đồng thời:
+    # - danh sách từ có dấu câu cho segmenter (giống tokenize_with_punctuation)
+    # - danh sách từ đã làm sạch (giống tokenize(clean_text(...)))
+    # - offset [start, end] của từng từ có dấu câu trong original_text
+    # - offset [start, end] của từng từ đã làm sạch trong original_text
+    if original_text is None:
+        original_text = text
+
+    word_tokenize = get_word_tokenize()
+    try:
+        raw_tokens = word_tokenize(text, format="text").split()
+        split_punct = True
+    except:
+        raw_tokens = simple_tokenize_with_punctuation(text)
+        split_punct = False
+
+    words_with_punctuation = []
+    offsets = []
+    cleaned = []
+    cleaned_offsets = []
+    for token, (start, end) in zip(raw_tokens, token_offsets(raw_tokens, original_text)):
+        pieces = clean_token(token)
+        cleaned.extend(pieces)
+        cleaned_offsets.extend(piece_offsets(pieces, start, end, original_text))
+        if split_punct and token and token[-1] in '.!?':
+            # Tách dấu câu cuối từ, offset chia tương ứng
+            mid = end - 1 if end > 0 else -1
+            words_with_punctuation.append(token[:-1])
+            offsets.append([start, mid])
+            words_with_punctuation.append(token[-1])
+            offsets.append([mid, end])
+        else:
+            words_with_punctuation.append(token)
+            offsets.append([start, end])
+
+    return words_with_punctuation, cleaned, offsets, cleaned_offsets
+
+def tokenize_cleaned(text):
+    # Tách từ một lần và chỉ trả về danh sách từ đã làm sạch (dùng cho chế độ streaming)
+    word_tokenize = get_word_tokenize()
+    try:
+        raw_tokens = word_tokenize(text, format="text").split()
+    except:
+        raw_tokens = simple_tokenize_with_punctuation(text)
+    cleaned = []
+    for token in raw_tokens:
+        cleaned.extend(clean_token(token))
+    return cleaned
 
 def remove_stopwords(words):
     # Loại bỏ stopwords
     return [w for w in words if w.lower() not in STOPWORDS]
 
+# Luật chuẩn hóa tiếng Anh: (đuôi, độ dài tối thiểu của từ để cắt), xét theo thứ tự
+ENGLISH_SUFFIX_RULES = [('ing', 4), ('ed', 3), ('es', 3), ('s', 2)]
+
 def normalize_english(words):
     # Chuẩn hóa từ tiếng Anh: bỏ đuôi s, es, ing, ed
     result = []
     for word in words:
-        if word.endswith('ing') and len(word) > 4:
-            word = word[:-3]
-        elif word.endswith('ed') and len(word) > 3:
-            word = word[:-2]
-        elif word.endswith('es') and len(word) > 3:
-            word = word[:-2]
-        elif word.endswith('s') and len(word) > 2:
-            word = word[:-1]
+        for suffix, min_len in ENGLISH_SUFFIX_RULES:
+            if word.endswith(suffix) and len(word) > min_len:
+                word = word[:-len(suffix)]
+                break
         result.append(word)
     return result
 
@@ -155,14 +294,161 @@ def setup_logging(log_file="preprocess_log.txt"):
         _logger = logging.getLogger(__name__)
     return _logger
 
-def preprocess(file_path, enable_logging=True):
+# ===== Cache kết quả tiền xử lý trên đĩa =====
+# Tăng số này mỗi khi đổi logic tiền xử lý để bỏ qua các entry cache cũ
+PREPROCESS_VERSION = 3
+
+# Thư mục cache và giới hạn dung lượng (vượt quá thì xóa entry ít dùng nhất - LRU)
+CACHE_DIR = os.environ.get("PREPROCESS_CACHE_DIR", ".preprocess_cache")
+CACHE_MAX_BYTES = 200 * 1024 * 1024
+
+# Bộ đếm hit/miss để theo dõi hiệu quả cache
+CACHE_STATS = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+_tokenizer_version = None
+
+def get_tokenizer_version():
+    # Lấy phiên bản underthesea từ metadata (không cần import thư viện)
+    global _tokenizer_version
+    if _tokenizer_version is None:
+        try:
+            from importlib.metadata import version
+            _tokenizer_version = version("underthesea")
+        except Exception:
+            _tokenizer_version = "unknown"
+    return _tokenizer_version
+
+def config_fingerprint():
+    # Băm cấu hình tiền xử lý: stopwords, luật chuẩn hóa tiếng Anh, phiên bản tokenizer
+    config = {
+        "version": PREPROCESS_VERSION,
+        "stopwords": sorted(STOPWORDS),
+        "english_rules": ENGLISH_SUFFIX_RULES,
+        "tokenizer": get_tokenizer_version()
+    }
+    raw = json.dumps(config, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+def cache_key(file_bytes):
+    # Khóa cache = hash(nội dung file + cấu hình tiền xử lý)
+    h = hashlib.sha256()
+    h.update(config_fingerprint().encode('ascii'))
+    h.update(file_bytes)
+    return h.hexdigest()
+
+def _cache_path(key):
+    return os.path.join(CACHE_DIR, key + ".json")
+
+def cache_load(key):
+    # Đọc kết quả từ cache, trả về None nếu chưa có
+    path = _cache_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        # Entry hỏng thì xóa đi, coi như miss
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    # Cập nhật thời gian truy cập để phục vụ LRU
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+    return data
+
+def cache_store(key, result):
+    # Ghi kết quả vào cache (ghi file tạm rồi đổi tên để tránh entry ghi dở)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _cache_path(key)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    CACHE_STATS["writes"] += 1
+    evict_cache()
+
+def evict_cache(max_bytes=None):
+    # Xóa các entry dùng lâu nhất cho đến khi tổng dung lượng <= max_bytes
+    if max_bytes is None:
+        max_bytes = CACHE_MAX_BYTES
+    if not os.path.isdir(CACHE_DIR):
+        return 0
+
+    entries = []
+    total = 0
+    for name in os.listdir(CACHE_DIR):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(CACHE_DIR, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+        total += st.st_size
+
+    removed = 0
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+
+    CACHE_STATS["evictions"] += removed
+    return removed
+
+def get_cache_stats():
+    # Thống kê cache: hit, miss, tỉ lệ hit
+    stats = dict(CACHE_STATS)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    return stats
+
+def clear_cache():
+    # Xóa toàn bộ cache trên đĩa
+    if not os.path.isdir(CACHE_DIR):
+        return
+    for name in os.listdir(CACHE_DIR):
+        try:
+            os.remove(os.path.join(CACHE_DIR, name))
+        except OSError:
+            pass
+
+def preprocess(file_path, enable_logging=True, use_cache=True, vocab=None):
     # Hàm chính: tiền xử lý văn bản
+    # vocab: Vocabulary dùng chung; nếu có thì kết quả có thêm 'document' (TokenDocument
+    # của danh sách từ đã làm sạch) để các hàm so sánh dùng trực tiếp
     logger = setup_logging() if enable_logging else None
     
     if logger:
         logger.info(f"Bắt đầu xử lý file: {file_path}")
     
     try:
+        # Tra cache theo nội dung file, nếu trúng thì bỏ qua toàn bộ bước tách từ
+        key = None
+        if use_cache and os.path.isfile(file_path):
+            with open(file_path, 'rb') as f:
+                key = cache_key(f.read())
+            cached = cache_load(key)
+            if cached is not None:
+                CACHE_STATS["hits"] += 1
+                if logger:
+                    logger.info(f"Lấy kết quả từ cache: {file_path}")
+                if vocab is not None:
+                    cached['document'] = encode_document(cached['cleaned'], vocab)
+                return cached
+            CACHE_STATS["misses"] += 1
+
         # Đọc file
         original_text = read_file(file_path)
         if logger:
@@ -173,22 +459,20 @@ def preprocess(file_path, enable_logging=True):
         if logger:
             logger.info("Đã chuẩn hóa text với dấu câu cho segmenter")
         
-        # Text đã làm sạch (bỏ dấu câu) cho các mục đích khác
-        cleaned_text = clean_text(original_text)
-        if logger:
-            logger.info("Đã làm sạch text: lowercase, bỏ ký tự đặc biệt")
-        
-        # Danh sách từ có dấu câu cho segmenter
-        words_with_punctuation = tokenize_with_punctuation(text_with_punctuation)
+        # Tách từ một lần duy nhất: vừa có danh sách từ có dấu câu cho segmenter,
+        # vừa có danh sách từ đã làm sạch (lowercase, bỏ ký tự đặc biệt)
+        words_with_punctuation, words, punctuation_offsets, word_offsets = tokenize_single_pass(
+            text_with_punctuation, original_text
+        )
         if logger:
             logger.info(f"Đã tách từ với dấu câu: {len(words_with_punctuation)} từ")
         
-        # Danh sách từ đã làm sạch
-        words = tokenize(cleaned_text)
         original_words = words.copy()
         if logger:
             logger.info(f"Đã tách từ: {len(original_words)} từ gốc")
         
+        # Bỏ stopwords đồng thời với offset tương ứng (chuẩn hóa tiếng Anh giữ nguyên số từ)
+        word_offsets = [off for w, off in zip(words, word_offsets) if w.lower() not in STOPWORDS]
         words = remove_stopwords(words)
         if logger:
             logger.info(f"Đã loại bỏ stopwords: còn {len(words)} từ")
@@ -204,57 +488,231 @@ def preprocess(file_path, enable_logging=True):
             logger.info(f"Thống kê: {len(original_words)} từ gốc -> {len(words)} từ đã clean")
             logger.info(f"Hoàn thành xử lý file: {file_path}")
         
-        return {
+        result = {
             'original_text': original_text,  # Text gốc hoàn toàn
             'clean_text': text_with_punctuation,  # Text với dấu câu cho segmenter
             'original': original_words,  # Từ gốc (đã làm sạch một phần)
             'cleaned': words,  # Từ đã làm sạch hoàn toàn
+            'cleaned_offsets': word_offsets,  # Offset [start, end] của từng từ cleaned trong original_text
             'words_with_punctuation': words_with_punctuation,  # Danh sách từ có dấu câu cho segmenter
+            'words_with_punctuation_offsets': punctuation_offsets,  # Offset [start, end] trong original_text
             'reconstructed_sentence': reconstructed_sentence,  # Câu đã ghép lại sau khi xử lý
             'original_count': len(original_words),
             'cleaned_count': len(words),
             'words_with_punctuation_count': len(words_with_punctuation)
         }
+
+        if key is not None:
+            try:
+                cache_store(key, result)
+            except OSError as e:
+                # Lỗi ghi cache không được làm hỏng kết quả tiền xử lý
+                if logger:
+                    logger.warning(f"Không ghi được cache: {e}")
+
+        # Gắn sau khi ghi cache vì TokenDocument không lưu được ra JSON
+        if vocab is not None:
+            result['document'] = encode_document(words, vocab)
+        return result
     except Exception as e:
         if logger:
             logger.error(f"Lỗi khi xử lý file {file_path}: {str(e)}")
         raise
 
-import json
+# ===== Tiền xử lý hàng loạt trên nhiều process =====
+def _init_worker():
+    # Khởi tạo worker: nạp underthesea (và model tách từ) đúng một lần cho mỗi process
+    try:
+        get_word_tokenize()("khởi động", format="text")
+    except Exception:
+        pass
+
+def _preprocess_one(file_path, enable_logging=False, use_cache=True):
+    # Tiền xử lý một file; lỗi được ghi lại thay vì làm dừng cả batch
+    start = time.time()
+    hits_before = CACHE_STATS["hits"]
+    try:
+        result = preprocess(file_path, enable_logging=enable_logging, use_cache=use_cache)
+        error = None
+    except Exception as e:
+        result = None
+        error = f"{type(e).__name__}: {e}"
+    return {
+        "path": file_path,
+        "ok": error is None,
+        "result": result,
+        "error": error,
+        "cache_hit": CACHE_STATS["hits"] > hits_before,
+        "time_seconds": time.time() - start
+    }
+
+def preprocess_many(paths, workers=None, ordered=True, enable_logging=False, use_cache=True):
+    # Tiền xử lý nhiều file song song trên process pool
+    # workers: số process (mặc định = số CPU), workers=1 thì chạy tuần tự trong process hiện tại
+    # ordered=True: kết quả theo thứ tự đầu vào; False: theo thứ tự hoàn thành
+    # Mỗi phần tử trả về: path, index, ok, result, error, cache_hit, time_seconds
+    paths = list(paths)
+    if not paths:
+        return []
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(paths)))
+
+    if workers == 1:
+        records = []
+        for idx, path in enumerate(paths):
+            record = _preprocess_one(path, enable_logging, use_cache)
+            record["index"] = idx
+            records.append(record)
+        return records
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    records = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {
+            pool.submit(_preprocess_one, path, enable_logging, use_cache): idx
+            for idx, path in enumerate(paths)
+        }
+        for future in (futures if ordered else as_completed(futures)):
+            idx = futures[future]
+            try:
+                record = future.result()
+            except Exception as e:
+                # Worker chết giữa chừng (vd. hết bộ nhớ): chỉ đánh dấu file đó lỗi
+                record = {
+                    "path": paths[idx],
+                    "ok": False,
+                    "result": None,
+                    "error": f"{type(e).__name__}: {e}",
+                    "cache_hit": False,
+                    "time_seconds": 0.0
+                }
+            record["index"] = idx
+            records.append(record)
+
+            # Bộ đếm cache nằm trong worker nên cộng dồn lại ở process chính
+            if use_cache and record["ok"]:
+                CACHE_STATS["hits" if record["cache_hit"] else "misses"] += 1
+
+    return records
+
+# ===== Chế độ streaming cho file rất lớn =====
+def read_chunks(file_path, chunk_size=STREAM_CHUNK_SIZE, encoding=None):
+    # Đọc file theo từng khối khoảng chunk_size ký tự, ưu tiên cắt ở ranh giới đoạn văn
+    # (dòng trống); nếu không có thì cắt ở khoảng trắng cuối cùng để không chẻ đôi một từ
+    if encoding is None:
+        encoding = detect_encoding(file_path, ENCODING_SAMPLE_BYTES)
+
+    buffer = []
+    size = 0
+    paragraph_end = 0  # Số dòng trong buffer tính đến dòng trống gần nhất
+    with open(file_path, 'r', encoding=encoding, errors='ignore') as f:
+        while True:
+            # readline có giới hạn để một dòng rất dài cũng không bị đọc hết vào bộ nhớ
+            line = f.readline(chunk_size)
+            if not line:
+                break
+            buffer.append(line)
+            size += len(line)
+            if not line.strip():
+                paragraph_end = len(buffer)
+
+            if size < chunk_size:
+                continue
+
+            if paragraph_end > 0:
+                yield ''.join(buffer[:paragraph_end])
+                buffer = buffer[paragraph_end:]
+            else:
+                text = ''.join(buffer)
+                cut = max(text.rfind(' '), text.rfind('\n'), text.rfind('\t'))
+                if cut <= 0:
+                    cut = len(text)
+                yield text[:cut]
+                buffer = [text[cut:]] if cut < len(text) else []
+            size = sum(len(l) for l in buffer)
+            paragraph_end = 0
+
+    if buffer:
+        yield ''.join(buffer)
+
+def preprocess_stream(file_path, chunk_size=STREAM_CHUNK_SIZE, enable_logging=True):
+    # Tiền xử lý dạng streaming cho file rất lớn: đoán encoding từ phần đầu file,
+    # xử lý từng khối và trả dần các từ đã làm sạch qua generator.
+    # Bộ nhớ tối đa tỉ lệ với chunk_size thay vì kích thước file.
+    logger = setup_logging() if enable_logging else None
+    check_file(file_path)
+
+    encoding = detect_encoding(file_path, ENCODING_SAMPLE_BYTES)
+    if logger:
+        logger.info(f"Bắt đầu xử lý streaming file: {file_path} (encoding: {encoding})")
+
+    total = 0
+    for chunk_idx, chunk in enumerate(read_chunks(file_path, chunk_size, encoding)):
+        text = clean_text_for_segmenter(chunk)
+        if not text:
+            continue
+        words = normalize_english(remove_stopwords(tokenize_cleaned(text)))
+        total += len(words)
+        if logger:
+            logger.info(f"Khối {chunk_idx}: {len(chunk)} ký tự -> {len(words)} từ")
+        yield from words
+
+    if logger:
+        logger.info(f"Hoàn thành xử lý streaming file: {file_path}. Tổng: {total} từ")
 
 if __name__ == "__main__":
+    import sys
+
+    # Cách dùng: python preprocess_text.py [file1 file2 ...] [--workers N]
+    args = sys.argv[1:]
+    workers = 1
+    if "--workers" in args:
+        idx = args.index("--workers")
+        workers = int(args[idx + 1])
+        del args[idx:idx + 2]
+
     # File input mẫu
-    file1 = "text1.txt"
-    file2 = "text2.txt"
+    files = args or ["text1.txt", "text2.txt"]
     
-    print(f"Đang xử lý {file1} và {file2}...")
+    print(f"Đang xử lý {', '.join(files)}...")
     
-    # Xử lý cả 2 file
     try:
-        result1 = preprocess(file1)
-        result2 = preprocess(file2)
+        records = preprocess_many(files, workers=workers, enable_logging=(workers == 1))
         
-        # Tạo data cho TV2, TV3...
-        output_data = {
-            "text1": {
-                "cleaned_words": result1['cleaned'],
-                "original_words": result1['original']
-            },
-            "text2": {
-                "cleaned_words": result2['cleaned'],
-                "original_words": result2['original']
+        # Tạo data cho TV2, TV3... (text1, text2, ... theo thứ tự file đầu vào)
+        output_data = {}
+        for record in records:
+            if not record["ok"]:
+                print(f"Lỗi khi xử lý {record['path']}: {record['error']}")
+                continue
+            output_data[f"text{record['index'] + 1}"] = {
+                "cleaned_words": record["result"]['cleaned'],
+                "original_words": record["result"]['original']
             }
-        }
         
         # Lưu ra file JSON
         with open("preprocessed_data.json", "w", encoding="utf-8") as f:
             json.dump(output_data, f, ensure_ascii=False, indent=2)
+
+        # Lưu thêm bản nhị phân gọn (đọc bằng memory-map) cho corpus lớn
+        from corpus_store import write_corpus
+        write_corpus(
+            "preprocessed_data.bin",
+            [data["cleaned_words"] for data in output_data.values()],
+            names=list(output_data.keys())
+        )
             
         print("\n--- Kết quả tiền xử lý ---")
-        print(f"Đã lưu dữ liệu sạch vào 'preprocessed_data.json'")
-        print(f"- Text 1: {result1['cleaned_count']} từ")
-        print(f"- Text 2: {result2['cleaned_count']} từ")
+        print(f"Đã lưu dữ liệu sạch vào 'preprocessed_data.json' và 'preprocessed_data.bin'")
+        for record in records:
+            if record["ok"]:
+                print(f"- Text {record['index'] + 1}: {record['result']['cleaned_count']} từ "
+                      f"({record['time_seconds']:.3f} giây)")
+
+        stats = get_cache_stats()
+        print(f"Cache: {stats['hits']} hit / {stats['misses']} miss")
         
     except Exception as e:
         print(f"Lỗi: {e}")
-
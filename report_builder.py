@@ -1,5 +1,5 @@
 import os
-import matplotlib.pyplot as plt
+import html as html_lib
 from datetime import datetime
 
 # Tên hiển thị rút gọn cho các chiến lược
@@ -9,7 +9,10 @@ DISPLAY_NAME = {
     "Cosine Similarity (Segment-based)": "Cosine",
     "Brute Force Matching": "Bruteforce",
     "Edit Distance (Levenshtein DP)": "Edit Distance",
-    "Divide and Conquer (Pruning & Weighted)": "Divide & Conquer"
+    "Divide and Conquer (Pruning & Weighted)": "Divide & Conquer",
+    "Winnowing Fingerprint": "Winnowing",
+    "Suffix Automaton (Common Passages)": "Suffix Automaton",
+    "Greedy String Tiling (RKR-GST)": "GST"
 }
 
 # Màu pastel tương ứng cho từng chiến lược
@@ -19,7 +22,10 @@ PASTEL_COLORS = {
     "Cosine": "#A7C7E7",            
     "Bruteforce": "#D7BDE2",       
     "Edit Distance": "#F9E79F",     
-    "Divide & Conquer": "#F5B7B1"   
+    "Divide & Conquer": "#F5B7B1",
+    "Winnowing": "#FAD7A0",
+    "Suffix Automaton": "#AED6F1",
+    "GST": "#D5F5E3"
 }
 
 def plot_bar(data, title, ylabel, filename, log_scale=False):
@@ -31,6 +37,9 @@ def plot_bar(data, title, ylabel, filename, log_scale=False):
     filename: tên file ảnh đầu ra
     log_scale: có sử dụng thang log cho trục Y hay không
     """
+    # Chỉ import matplotlib khi thật sự vẽ biểu đồ (import rất chậm)
+    import matplotlib.pyplot as plt
+
     names = []
     values = []
     colors = []
@@ -94,6 +103,39 @@ def build_table(results):
     html += "</table>"
     return html
 
+def passage_location(p, side):
+    # Vị trí ký tự trong văn bản gốc nếu có; không thì ghi rõ là vị trí từ trong văn bản đã chuẩn hóa
+    start, end = p.get(f"source_start{side}"), p.get(f"source_end{side}")
+    if start is not None and end is not None:
+        return f"ký tự {start}-{end} (văn bản gốc)"
+    return f"từ {p[f'word_start{side}']}-{p[f'word_end{side}']} (văn bản đã chuẩn hóa)"
+
+def build_passages(results, limit=10):
+    """
+    Tạo danh sách HTML các đoạn văn bị sao chép (nếu chiến lược có trả về copied_passages)
+    Chỉ hiển thị limit đoạn dài nhất, kèm vị trí trong mỗi văn bản gốc
+    """
+    passages = []
+    for r in results:
+        passages.extend(r.get("details", {}).get("copied_passages", []))
+    if not passages:
+        return ""
+
+    passages = sorted(passages, key=lambda p: p["length_words"], reverse=True)[:limit]
+
+    html = "<h4>Các đoạn trùng khớp dài nhất</h4><ol>"
+    for p in passages:
+        html += f"""
+        <li>
+          <mark>{html_lib.escape(p["text"])}</mark>
+          <br><small>Văn bản 1: {passage_location(p, 1)} |
+          Văn bản 2: {passage_location(p, 2)} |
+          {p["length_words"]} từ</small>
+        </li>
+        """
+    html += "</ol>"
+    return html
+
 def build_report(all_cases, output_file="report.html"):
     """
     Xây dựng báo cáo HTML tổng hợp cho tất cả các bộ kiểm thử
@@ -154,6 +196,8 @@ def build_report(all_cases, output_file="report.html"):
         th {{ background: #f2f2f2; }}
         img {{ width: 420px; margin: 15px 0; }}
         .case {{ margin-bottom: 40px; }}
+        mark {{ background: #F9E79F; }}
+        li {{ margin-bottom: 8px; }}
       </style>
     </head>
     <body>
@@ -173,6 +217,7 @@ def build_report(all_cases, output_file="report.html"):
         <div class="case">
           <h3>{case.get("case", "")}</h3>
           {build_table(case.get("results", []))}
+          {build_passages(case.get("results", []))}
         </div>
         """
 
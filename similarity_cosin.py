@@ -1,11 +1,12 @@
 import math
-from collections import Counter
+import heapq
 import time
+from similarity_jaccard import token_counts
 
 #chuyển list từ thành vector tần suất
 def vectorize(words, vocabulary):
     
-    count = Counter(words)
+    count = token_counts(words)
     return [count.get(word, 0) for word in vocabulary]
 
 #tính Cosine Similarity giữa 2 vector
@@ -19,33 +20,113 @@ def cosine_similarity(vec1, vec2):
         return 0.0
     return dot / (norm1 * norm2)
 
+# Số ô tối đa của ma trận điểm được giữ trong bộ nhớ cùng lúc (chia khối theo hàng)
+COSINE_MAX_CELLS = 1_000_000
+
+#tính vector tần suất (dạng thưa) và chuẩn L2 của từng đoạn, mỗi đoạn chỉ tính một lần
+def term_frequency_rows(segments):
+    
+    rows = []
+    for seg in segments:
+        count = token_counts(seg)
+        norm = math.sqrt(sum(c * c for c in count.values()))
+        rows.append((count, norm))
+    return rows
+
+#tính ma trận cosine n x m giữa 2 danh sách đoạn, trả về từng khối hàng (hàng bắt đầu, các hàng điểm)
+def cosine_matrix_blocks(segments1, segments2, max_cells=COSINE_MAX_CELLS):
+    
+    rows1 = term_frequency_rows(segments1)
+    rows2 = term_frequency_rows(segments2)
+    m = len(rows2)
+    norms2 = [norm for _, norm in rows2]
+
+    # Chỉ mục ngược của văn bản 2: từ -> [(j, tần suất)] (ma trận thưa lưu theo từ)
+    postings = {}
+    for j, (count, _) in enumerate(rows2):
+        for word, c in count.items():
+            postings.setdefault(word, []).append((j, c))
+
+    # Tích ma trận thưa: chỉ cộng các cặp (đoạn, từ) thực sự có chung từ
+    block_rows = max(1, max_cells // m) if m else 1
+    for start in range(0, len(rows1), block_rows):
+        block = []
+        for count, norm1 in rows1[start:start + block_rows]:
+            dots = [0] * m
+            for word, c in count.items():
+                for j, c2 in postings.get(word, ()):
+                    dots[j] += c * c2
+            block.append([
+                dots[j] / (norm1 * norms2[j]) if norm1 and norms2[j] else 0.0
+                for j in range(m)
+            ])
+        yield start, block
+
+#tính toàn bộ ma trận cosine n x m
+def cosine_matrix(segments1, segments2, max_cells=COSINE_MAX_CELLS):
+    
+    matrix = []
+    for _, block in cosine_matrix_blocks(segments1, segments2, max_cells):
+        matrix.extend(block)
+    return matrix
+
+#thứ tự xếp hạng cặp (i, j, điểm): điểm giảm dần, cùng điểm thì cặp đứng trước (i, j nhỏ) lên trước
+def _pair_rank(pair):
+    return (pair[2], -pair[0], -pair[1])
+
 #so sánh từng đoạn của 2 văn bản
-def compare_segments_cosine(segments1, segments2):
+#top_k: chỉ giữ k cặp giống nhất (bộ nhớ O(k + m) thay vì O(n*m))
+#best_per_row: thêm cặp tốt nhất của mỗi đoạn văn bản 1
+def compare_segments_cosine(segments1, segments2, max_cells=COSINE_MAX_CELLS, top_k=None, best_per_row=False):
     
     results = []
+    best_rows = []
     start = time.time()
 
-    for i, seg1 in enumerate(segments1):
-        for j, seg2 in enumerate(segments2):
-            vocab = list(set(seg1) | set(seg2))
-            vec1 = vectorize(seg1, vocab)
-            vec2 = vectorize(seg2, vocab)
-
-            score = cosine_similarity(vec1, vec2)
-
-            results.append({
-                "segment_1": i,
-                "segment_2": j,
-                "cosine_score": score
-            })
+    for row_start, block in cosine_matrix_blocks(segments1, segments2, max_cells):
+        for offset, row in enumerate(block):
+            i = row_start + offset
+
+            if best_per_row and row:
+                best_j = max(range(len(row)), key=row.__getitem__)
+                best_rows.append({
+                    "segment_1": i,
+                    "segment_2": best_j,
+                    "cosine_score": row[best_j]
+                })
+
+            if top_k is None:
+                for j, score in enumerate(row):
+                    results.append({
+                        "segment_1": i,
+                        "segment_2": j,
+                        "cosine_score": score
+                    })
+            else:
+                # Lấy k ứng viên tốt nhất của hàng rồi gộp, định kỳ rút gọn về k cặp
+                for j in heapq.nlargest(top_k, range(len(row)), key=row.__getitem__):
+                    results.append((i, j, row[j]))
+                if len(results) > 4 * top_k:
+                    results = heapq.nlargest(top_k, results, key=_pair_rank)
+
+    if top_k is None:
+        results = sorted(results, key=lambda x: x["cosine_score"], reverse=True)
+    else:
+        results = [
+            {"segment_1": i, "segment_2": j, "cosine_score": score}
+            for i, j, score in heapq.nlargest(top_k, results, key=_pair_rank)
+        ]
 
     elapsed = time.time() - start
 
-    return {
+    output = {
         "strategy": "Cosine Similarity (Segment-based)",
         "time_seconds": elapsed,
-        "results": sorted(results, key=lambda x: x["cosine_score"], reverse=True)
+        "results": results
     }
+    if best_per_row:
+        output["best_per_row"] = best_rows
+    return output
 
 
 if __name__ == "__main__":
@@ -64,7 +145,7 @@ if __name__ == "__main__":
         print("Không đủ dữ liệu để so sánh.")
         exit()
 
-    result = compare_segments_cosine(segments1, segments2)
+    result = compare_segments_cosine(segments1, segments2, top_k=5)
 
     print("Thời gian:", result["time_seconds"], "giây")
     print("Top 5 đoạn giống nhất:")
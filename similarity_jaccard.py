@@ -1,13 +1,66 @@
 from collections import Counter
+import hashlib
+import random
 import time
+from token_vocab import decode_token
+
+class DocumentProfile:
+    """
+    Đặc trưng tính sẵn của một văn bản: tập từ, bảng tần suất, độ dài, tập bigram (tùy chọn).
+    Dùng thay cho list từ ở các hàm so sánh khi một văn bản được so với nhiều văn bản khác,
+    để chi phí dựng set/Counter của văn bản cố định chỉ phải trả một lần.
+    """
+
+    __slots__ = ('words', 'unique', 'counts', 'length', '_bigrams')
+
+    def __init__(self, words, bigrams=False):
+        self.words = words
+        self.unique = set(words)
+        self.counts = Counter(words)
+        self.length = len(words)
+        self._bigrams = None
+        if bigrams:
+            self._bigrams = self.bigrams
+
+    @property
+    def bigrams(self):
+        # Tập bigram (tính ở lần dùng đầu tiên nếu chưa yêu cầu khi tạo)
+        if self._bigrams is None:
+            words = list(self.words)
+            self._bigrams = set(zip(words, words[1:]))
+        return self._bigrams
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return iter(self.words)
+
+def make_profile(words, bigrams=False):
+    # Tạo DocumentProfile (giữ nguyên nếu đã là profile)
+    if isinstance(words, DocumentProfile):
+        return words
+    return DocumentProfile(words, bigrams)
+
+def token_set(words):
+    # Tập từ của list từ / TokenDocument / DocumentProfile
+    if isinstance(words, DocumentProfile):
+        return words.unique
+    return set(words)
+
+def token_counts(words):
+    # Bảng tần suất từ của list từ / TokenDocument / DocumentProfile
+    if isinstance(words, DocumentProfile):
+        return words.counts
+    return Counter(words)
 
 def jaccard_similarity(words1, words2):
     # Tính độ tương đồng Jaccard
     if not words1 or not words2:
         return 0.0
     
-    set1 = set(words1)
-    set2 = set(words2)
+    set1 = token_set(words1)
+    set2 = token_set(words2)
     
     # Giao và hợp của 2 tập hợp
     intersection = set1 & set2
@@ -21,46 +74,54 @@ def overlap_ratio(words1, words2):
     if not words1 or not words2:
         return 0.0
     
-    set1 = set(words1)
-    set2 = set(words2)
+    set1 = token_set(words1)
+    set2 = token_set(words2)
     intersection = set1 & set2
     
     return len(intersection) / min(len(set1), len(set2))
 
 def top_common_words(words1, words2, n=10):
     # Tìm top từ trùng nhiều nhất
-    common = set(words1) & set(words2)
+    common = token_set(words1) & token_set(words2)
     if not common:
         return []
     
     # Đếm tần suất
-    count1 = Counter(words1)
-    count2 = Counter(words2)
+    count1 = token_counts(words1)
+    count2 = token_counts(words2)
     
     # Tổng tần suất của từ chung
     common_freq = {word: count1[word] + count2[word] for word in common}
-    return sorted(common_freq.items(), key=lambda x: x[1], reverse=True)[:n]
+    top = sorted(common_freq.items(), key=lambda x: x[1], reverse=True)[:n]
+    # Nếu đầu vào là TokenDocument thì đổi mã số về từ để hiển thị
+    source = words1.words if isinstance(words1, DocumentProfile) else words1
+    return [(decode_token(source, word), freq) for word, freq in top]
 
 def compare_jaccard(words1, words2):
     # Hàm chính: so sánh 2 văn bản
+    # words1/words2 có thể là list từ, TokenDocument hoặc DocumentProfile tính sẵn
     start = time.time()
+
+    # Mỗi văn bản chỉ dựng set/Counter một lần cho tất cả các chỉ số bên dưới
+    profile1 = make_profile(words1)
+    profile2 = make_profile(words2)
     
     # Validation: Kiểm tra rỗng hoặc quá ngắn
     warnings = []
-    if not words1:
+    if not profile1:
         warnings.append("Văn bản 1 rỗng")
-    elif len(words1) < 5:
+    elif len(profile1) < 5:
         warnings.append("Văn bản 1 quá ngắn (< 5 từ)")
         
-    if not words2:
+    if not profile2:
         warnings.append("Văn bản 2 rỗng")
-    elif len(words2) < 5:
+    elif len(profile2) < 5:
         warnings.append("Văn bản 2 quá ngắn (< 5 từ)")
     
     # Tính toán
-    jaccard = jaccard_similarity(words1, words2)
-    overlap = overlap_ratio(words1, words2)
-    top_words = top_common_words(words1, words2, 10)
+    jaccard = jaccard_similarity(profile1, profile2)
+    overlap = overlap_ratio(profile1, profile2)
+    top_words = top_common_words(profile1, profile2, 10)
     
     elapsed = time.time() - start
     
@@ -71,7 +132,7 @@ def compare_jaccard(words1, words2):
         "time_seconds": elapsed,
         "details": {
             "overlap_ratio": overlap,
-            "common_words": len(set(words1) & set(words2)),
+            "common_words": len(profile1.unique & profile2.unique),
             "top_common": top_words,
             "warnings": warnings  # Thêm cảnh báo vào output
         }
@@ -79,10 +140,120 @@ def compare_jaccard(words1, words2):
     
     return result
 
-import json
-from preprocess_text import preprocess
+# ===== MinHash + LSH: tìm văn bản giống trong corpus lớn mà không so từng cặp =====
+MINHASH_PRIME = (1 << 61) - 1
+MINHASH_NUM_PERM = 128
+
+def stable_token_hash(token):
+    # Hash 64-bit ổn định giữa các lần chạy/process (hash() của Python với str bị ngẫu nhiên hóa)
+    if isinstance(token, int):
+        data = token.to_bytes(8, 'little', signed=True)
+    else:
+        data = str(token).encode('utf-8')
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little')
+
+def minhash_permutations(num_perm=MINHASH_NUM_PERM, seed=1):
+    # Các hàm băm h(x) = (a*x + b) mod p đóng vai trò hoán vị ngẫu nhiên
+    rng = random.Random(seed)
+    return [(rng.randrange(1, MINHASH_PRIME), rng.randrange(0, MINHASH_PRIME)) for _ in range(num_perm)]
+
+def minhash_signature(words, num_perm=MINHASH_NUM_PERM, seed=1, permutations=None):
+    # Chữ ký MinHash: với mỗi hoán vị lấy giá trị băm nhỏ nhất trên tập từ
+    if permutations is None:
+        permutations = minhash_permutations(num_perm, seed)
+    hashes = [stable_token_hash(w) for w in token_set(words)]
+    if not hashes:
+        return [MINHASH_PRIME] * len(permutations)
+    p = MINHASH_PRIME
+    return [min((a * h + b) % p for h in hashes) for a, b in permutations]
+
+def estimate_jaccard(signature1, signature2):
+    # Ước lượng Jaccard = tỉ lệ vị trí trùng nhau của 2 chữ ký
+    if not signature1 or len(signature1) != len(signature2):
+        return 0.0
+    same = sum(1 for x, y in zip(signature1, signature2) if x == y)
+    return same / len(signature1)
+
+def optimal_bands(threshold, num_perm=MINHASH_NUM_PERM):
+    # Chọn số band b (b chia hết num_perm) để ngưỡng LSH (1/b)^(1/r) gần threshold nhất
+    best_b, best_diff = 1, None
+    for b in range(1, num_perm + 1):
+        if num_perm % b:
+            continue
+        r = num_perm // b
+        diff = abs((1 / b) ** (1 / r) - threshold)
+        if best_diff is None or diff < best_diff:
+            best_b, best_diff = b, diff
+    return best_b
+
+class MinHashLSH:
+    """
+    Chỉ mục LSH chia chữ ký MinHash thành các band.
+    Hai văn bản là ứng viên nếu trùng toàn bộ một band; ứng viên được chấm lại
+    bằng jaccard_similarity chính xác.
+    - nhiều band / ít hàng mỗi band: recall cao hơn, nhiều ứng viên hơn (chậm hơn)
+    - ít band / nhiều hàng mỗi band: ít ứng viên (nhanh hơn), dễ bỏ sót hơn
+    """
+
+    def __init__(self, threshold=0.5, num_perm=MINHASH_NUM_PERM, bands=None, seed=1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands or optimal_bands(threshold, num_perm)
+        self.rows = num_perm // self.bands
+        if self.rows < 1:
+            raise ValueError("Số band không được lớn hơn số hoán vị")
+        self.permutations = minhash_permutations(num_perm, seed)
+        self.buckets = [{} for _ in range(self.bands)]
+        self.signatures = {}
+        self.token_sets = {}
+
+    def signature(self, words):
+        return minhash_signature(words, permutations=self.permutations)
+
+    def _band_keys(self, signature):
+        r = self.rows
+        return [tuple(signature[b * r:(b + 1) * r]) for b in range(self.bands)]
+
+    def insert(self, key, words, signature=None):
+        # Thêm văn bản vào chỉ mục (giữ lại tập từ để chấm lại chính xác)
+        if signature is None:
+            signature = self.signature(words)
+        self.signatures[key] = signature
+        self.token_sets[key] = token_set(words)
+        for bucket, band in zip(self.buckets, self._band_keys(signature)):
+            bucket.setdefault(band, []).append(key)
+        return signature
+
+    def candidates(self, signature):
+        # Các văn bản trùng ít nhất một band với chữ ký truy vấn
+        found = set()
+        for bucket, band in zip(self.buckets, self._band_keys(signature)):
+            found.update(bucket.get(band, ()))
+        return found
+
+    def query(self, words, threshold=None, exact=True):
+        # Trả về [(key, độ giống)] giảm dần với các văn bản có Jaccard >= threshold
+        # exact=False: dùng Jaccard ước lượng từ chữ ký thay vì tính lại chính xác
+        if threshold is None:
+            threshold = self.threshold
+        signature = self.signature(words)
+        results = []
+        for key in self.candidates(signature):
+            if exact:
+                score = jaccard_similarity(words, self.token_sets[key])
+            else:
+                score = estimate_jaccard(signature, self.signatures[key])
+            if score >= threshold:
+                results.append((key, score))
+        return sorted(results, key=lambda x: x[1], reverse=True)
+
+    def __len__(self):
+        return len(self.signatures)
 
 if __name__ == "__main__":
+    import json
+    from preprocess_text import preprocess
+
     # 1. Lấy dữ liệu từ file đã tiền xử lý (hoặc chạy lại)
     try:
         print("Đang tính toán Jaccard Similarity...")
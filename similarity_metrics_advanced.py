@@ -1,5 +1,6 @@
 import re
 import math
+from similarity_jaccard import DocumentProfile, token_set
 
 def generate_ngrams(words, n):
     """
@@ -20,9 +21,20 @@ def normalize_ngram(ngram):
     )
 
 
+def ngram_set(words, n=2):
+    """
+    Tập n-gram của văn bản; với DocumentProfile và n=2 dùng tập bigram đã tính sẵn
+    """
+    if isinstance(words, DocumentProfile):
+        if n == 2:
+            return words.bigrams
+        words = words.words
+    return set(generate_ngrams(words, n))
+
+
 def ngram_similarity(words1, words2, n=2):
-    g1 = set(generate_ngrams(words1, n))
-    g2 = set(generate_ngrams(words2, n))
+    g1 = ngram_set(words1, n)
+    g2 = ngram_set(words2, n)
 
     if not g1 or not g2:
         return 0.0
@@ -31,33 +43,96 @@ def ngram_similarity(words1, words2, n=2):
 
 
 def compute_tf(words):
-    tf = {}
+    if isinstance(words, DocumentProfile):
+        tf = words.counts
+    else:
+        tf = {}
+        for w in words:
+            tf[w] = tf.get(w, 0) + 1
     total = len(words)
-    for w in words:
-        tf[w] = tf.get(w, 0) + 1
     return {w: c / total for w, c in tf.items()}
 
 
+class DocumentFrequencyIndex:
+    """
+    Chỉ mục tần suất tài liệu (DF) dựng một lần cho cả corpus (hoặc mọi đoạn của 2 văn bản),
+    thêm văn bản mới thì cập nhật tăng dần. Tra IDF O(1), công thức giống compute_idf:
+    idf(w) = log(N / (df(w) + 1))
+    """
+
+    def __init__(self, documents=None):
+        self.df = {}
+        self.num_documents = 0
+        if documents:
+            for doc in documents:
+                self.add_document(doc)
+
+    def add_document(self, words):
+        self.num_documents += 1
+        df = self.df
+        for w in token_set(words):
+            df[w] = df.get(w, 0) + 1
+
+    def idf(self, word):
+        return math.log(self.num_documents / (self.df.get(word, 0) + 1))
+
+    def idf_table(self):
+        N = self.num_documents
+        return {w: math.log(N / (c + 1)) for w, c in self.df.items()}
+
+    def tfidf_vector(self, words):
+        """
+        Vector TF-IDF (dict thưa) và chuẩn L2 tính sẵn của một văn bản
+        """
+        tf = compute_tf(words) if len(words) else {}
+        vec = {w: tf[w] * self.idf(w) for w in tf}
+        norm = math.sqrt(sum(v * v for v in vec.values()))
+        return vec, norm
+
+
 def compute_idf(documents):
     """
     documents: list[list[str]]
     """
-    N = len(documents)
-    idf = {}
-    vocab = set(word for doc in documents for word in doc)
-
-    for word in vocab:
-        df = sum(1 for doc in documents if word in doc)
-        idf[word] = math.log(N / (df + 1))
-    return idf
+    # Mỗi văn bản chỉ duyệt tập từ một lần: O(tổng số từ) thay vì O(V * D * L)
+    return DocumentFrequencyIndex(documents).idf_table()
 
 
 def compute_tfidf(tf, idf):
     return {w: tf[w] * idf.get(w, 0) for w in tf}
 
 
+def tfidf_cosine(tfidf1, norm1, tfidf2, norm2):
+    """
+    Cosine giữa 2 vector TF-IDF dùng chuẩn đã tính sẵn (DocumentFrequencyIndex.tfidf_vector)
+    """
+    if not norm1 or not norm2:
+        return 0.0
+    if len(tfidf1) > len(tfidf2):
+        tfidf1, tfidf2 = tfidf2, tfidf1
+    dot = 0.0
+    for w, v in tfidf1.items():
+        dot += v * tfidf2.get(w, 0)
+    return dot / (norm1 * norm2)
+
+
 def tfidf_similarity(tfidf1, tfidf2):
     score = 0.0
     for w in tfidf1:
         score += tfidf1[w] * tfidf2.get(w, 0)
     return score
+
+
+def pair_tfidf_similarity(tf1, tf2):
+    """
+    Điểm TF-IDF với IDF chỉ tính trên 2 văn bản, từ TF tính sẵn (compute_tf)
+    Giống hệt tfidf_similarity(compute_tfidf(tf1, idf), compute_tfidf(tf2, idf)) với
+    idf = compute_idf([doc1, doc2]): từ chỉ có ở 1 văn bản có idf = log(2/2) = 0,
+    từ chung có idf = log(2/3), nên chỉ cần duyệt từ chung
+    """
+    idf = math.log(2 / 3)
+    score = 0.0
+    for w, t in tf1.items():
+        if w in tf2:
+            score += (t * idf) * (tf2[w] * idf)
+    return score
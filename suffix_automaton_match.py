@@ -0,0 +1,177 @@
+# Chiến lược Suffix Automaton: tìm mọi đoạn văn trùng nguyên văn giữa 2 văn bản
+# Dựng suffix automaton trên dãy từ của văn bản 1 - O(n),
+# rồi cho văn bản 2 chạy qua automaton - O(m) - để lấy các đoạn chung dài nhất tại từng vị trí.
+import time
+
+from fingerprint_winnowing import merge_ranges
+from token_vocab import to_words
+
+MIN_PASSAGE_WORDS = 8   # Độ dài tối thiểu (số từ) của một đoạn trùng được báo cáo
+
+
+class SuffixAutomaton:
+    """
+    Suffix automaton trên một dãy phần tử băm được (thường là từ dạng chuỗi)
+    Dãy truy vấn phải cùng loại phần tử: mã số của TokenDocument chỉ có nghĩa trong vocab của nó
+    Mỗi trạng thái lưu: bảng chuyển, suffix link, độ dài chuỗi dài nhất,
+    và firstpos - vị trí kết thúc của lần xuất hiện đầu tiên (để ánh xạ về văn bản gốc)
+    """
+
+    def __init__(self, seq):
+        self.next = [{}]
+        self.link = [-1]
+        self.length = [0]
+        self.firstpos = [-1]
+        last = 0
+        for pos, token in enumerate(seq):
+            last = self._extend(last, token, pos)
+
+    def _new_state(self, length, firstpos, transitions=None, link=-1):
+        self.next.append(transitions if transitions is not None else {})
+        self.link.append(link)
+        self.length.append(length)
+        self.firstpos.append(firstpos)
+        return len(self.length) - 1
+
+    def _extend(self, last, token, pos):
+        nxt, link, length = self.next, self.link, self.length
+        cur = self._new_state(length[last] + 1, pos)
+        p = last
+        while p != -1 and token not in nxt[p]:
+            nxt[p][token] = cur
+            p = link[p]
+        if p == -1:
+            link[cur] = 0
+            return cur
+
+        q = nxt[p][token]
+        if length[p] + 1 == length[q]:
+            link[cur] = q
+            return cur
+
+        # Tách trạng thái q: bản sao giữ chuỗi ngắn hơn, cùng firstpos với q
+        clone = self._new_state(length[p] + 1, self.firstpos[q], dict(nxt[q]), link[q])
+        while p != -1 and nxt[p].get(token) == q:
+            nxt[p][token] = clone
+            p = link[p]
+        link[q] = clone
+        link[cur] = clone
+        return cur
+
+    def longest_matches(self, seq):
+        """
+        Cho dãy seq chạy qua automaton
+        Sinh (i, độ dài, trạng thái): đoạn dài nhất kết thúc tại seq[i] có xuất hiện trong văn bản gốc
+        """
+        nxt, link, length = self.next, self.link, self.length
+        state = 0
+        matched = 0
+        for i, token in enumerate(seq):
+            while state and token not in nxt[state]:
+                state = link[state]
+                matched = length[state]
+            if token in nxt[state]:
+                state = nxt[state][token]
+                matched += 1
+            else:
+                state = 0
+                matched = 0
+            yield i, matched, state
+
+    def common_passages(self, seq, min_length=MIN_PASSAGE_WORDS):
+        """
+        Trả về mọi đoạn chung cực đại có độ dài >= min_length:
+        [(start_a, start_b, độ dài)] với start_a là lần xuất hiện đầu tiên trong văn bản gốc
+        Đoạn kết thúc tại i là cực đại khi ở vị trí i + 1 độ dài khớp không tăng thêm 1
+        """
+        passages = []
+        prev = None
+        for i, matched, state in self.longest_matches(seq):
+            if prev is not None and matched != prev[1] + 1:
+                self._report(prev, min_length, passages)
+            prev = (i, matched, state)
+        if prev is not None:
+            self._report(prev, min_length, passages)
+        return passages
+
+    def _report(self, match, min_length, passages):
+        end_b, matched, state = match
+        if matched >= min_length:
+            end_a = self.firstpos[state]
+            passages.append((end_a - matched + 1, end_b - matched + 1, matched))
+
+    def __len__(self):
+        return len(self.length)
+
+
+def covered_length(ranges):
+    # Tổng độ dài phần hợp của các khoảng [start, end)
+    return sum(end - start for start, end in merge_ranges(ranges))
+
+def compare_suffix_automaton(words1, words2, min_length=MIN_PASSAGE_WORDS, max_report=10):
+    """
+    Hàm chính: tìm các đoạn trùng nguyên văn dài >= min_length từ
+    Độ giống = (số từ được phủ trong văn bản 1 + số từ được phủ trong văn bản 2) / (tổng số từ)
+    (phần phủ ở văn bản 1 tính theo lần xuất hiện đầu tiên của mỗi đoạn)
+    words1/words2: list[str] hoặc TokenDocument, không cần chung vocab
+    """
+    start = time.time()
+
+    # So trên từ đã giải mã để list[str] và TokenDocument (vocab bất kỳ) khớp được với nhau
+    plain1 = to_words(words1)
+    plain2 = to_words(words2)
+    automaton = SuffixAutomaton(plain1)
+    passages = automaton.common_passages(plain2, min_length)
+
+    covered1 = covered_length((a, a + n) for a, _, n in passages)
+    covered2 = covered_length((b, b + n) for _, b, n in passages)
+    total = len(words1) + len(words2)
+    score = (covered1 + covered2) / total if total else 0.0
+
+    longest = sorted(passages, key=lambda p: p[2], reverse=True)[:max_report]
+
+    elapsed = time.time() - start
+
+    return {
+        "strategy": "Suffix Automaton (Common Passages)",
+        "similarity_score": score,
+        "time_seconds": elapsed,
+        "details": {
+            "min_length": min_length,
+            "automaton_states": len(automaton),
+            "passage_count": len(passages),
+            "longest_passage": longest[0][2] if longest else 0,
+            "covered_words_text1": covered1,
+            "covered_words_text2": covered2,
+            "passages": [
+                {
+                    "start1": a,
+                    "start2": b,
+                    "length": n,
+                    "text": " ".join(plain1[a:a + n])
+                }
+                for a, b, n in longest
+            ]
+        }
+    }
+
+
+if __name__ == "__main__":
+    import json
+    from preprocess_text import preprocess
+
+    print("Đang tìm các đoạn trùng bằng Suffix Automaton...")
+
+    data1 = preprocess("text1.txt", enable_logging=False)
+    data2 = preprocess("text2.txt", enable_logging=False)
+
+    result = compare_suffix_automaton(data1["cleaned"], data2["cleaned"])
+
+    with open("suffix_automaton_result.json", "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print("Độ giống (tỉ lệ phủ):", round(result["similarity_score"], 4))
+    print("Số đoạn trùng:", result["details"]["passage_count"])
+    print("Thời gian:", result["time_seconds"], "giây")
+    for p in result["details"]["passages"]:
+        print(f"  - {p['length']} từ (vb1 @{p['start1']}, vb2 @{p['start2']}): {p['text'][:80]}")
@@ -1,14 +1,18 @@
 import os
 import json
+import logging
 
 # Import các module xử lý và so sánh văn bản
-from preprocess_text import preprocess
+from preprocess_text import preprocess, preprocess_many
 from similarity_jaccard import compare_jaccard
 from similarity_cosin import compare_segments_cosine
 from segmenter import segment_by_length
 from bruteforce_match import bruteforce_match
 from edit_distance_dp import process_edit_distance
 from divide_conquer_compare import divide_conquer_compare
+from fingerprint_winnowing import compare_winnowing
+from suffix_automaton_match import compare_suffix_automaton
+from greedy_string_tiling import compare_greedy_tiling
 
 # Thư mục chứa các test case
 TEST_DIR = "tests"
@@ -17,11 +21,11 @@ TEST_DIR = "tests"
 OUTPUT_DIR = "evaluation_results"
 os.makedirs(OUTPUT_DIR, exist_ok=True)  # Tạo thư mục nếu chưa tồn tại
 
-def run_one_case(case_name, case_path, expected_similarity=None):
+def run_one_case(case_name, case_path, expected_similarity=None, data1=None, data2=None):
     """
     Chạy một test case:
     - Đọc 2 file văn bản
-    - Tiền xử lý
+    - Tiền xử lý (bỏ qua nếu data1/data2 đã được tiền xử lý sẵn)
     - So sánh bằng nhiều chiến lược khác nhau
     - Lưu kết quả ra file JSON
     """
@@ -32,8 +36,10 @@ def run_one_case(case_name, case_path, expected_similarity=None):
     text2_path = os.path.join(case_path, "text2.txt")
 
     # Tiền xử lý văn bản (làm sạch, tách từ, chuẩn hóa,…)
-    data1 = preprocess(text1_path)
-    data2 = preprocess(text2_path)
+    if data1 is None:
+        data1 = preprocess(text1_path)
+    if data2 is None:
+        data2 = preprocess(text2_path)
 
     # Lấy danh sách từ sau khi đã làm sạch
     words1 = data1["cleaned"]
@@ -57,7 +63,7 @@ def run_one_case(case_name, case_path, expected_similarity=None):
 
     # ==== So sánh Cosine theo từng đoạn ====
     if seg1 and seg2:
-        raw = compare_segments_cosine(seg1, seg2)
+        raw = compare_segments_cosine(seg1, seg2, top_k=5)
 
         # Lấy điểm cosin cao nhất trong các cặp đoạn
         best_score = raw["results"][0]["cosine_score"] if raw["results"] else 0
@@ -102,6 +108,33 @@ def run_one_case(case_name, case_path, expected_similarity=None):
             }
         })
 
+    # === So sánh bằng Winnowing Fingerprint ===
+    raw = compare_winnowing(words1, words2)
+    results.append({
+        "strategy": raw["strategy"],
+        "similarity_score": raw["similarity_score"],
+        "time_seconds": raw["time_seconds"],
+        "details": raw.get("details", {})
+    })
+
+    # === So sánh bằng Suffix Automaton ===
+    raw = compare_suffix_automaton(words1, words2)
+    results.append({
+        "strategy": raw["strategy"],
+        "similarity_score": raw["similarity_score"],
+        "time_seconds": raw["time_seconds"],
+        "details": raw.get("details", {})
+    })
+
+    # === So sánh bằng Greedy String Tiling ===
+    raw = compare_greedy_tiling(words1, words2)
+    results.append({
+        "strategy": raw["strategy"],
+        "similarity_score": raw["similarity_score"],
+        "time_seconds": raw["time_seconds"],
+        "details": raw.get("details", {})
+    })
+
     # Tổng hợp kết quả của test case
     output = {
         "case": case_name,
@@ -117,10 +150,13 @@ def run_one_case(case_name, case_path, expected_similarity=None):
     print(f"Đã lưu kết quả: {out_file}")
 
 
-def run_all_tests():
+def run_all_tests(workers=None):
     """
     Chạy toàn bộ test case trong thư mục tests
+    Tiền xử lý tất cả file của mọi case trước trên process pool (workers process),
+    file nào lỗi thì chỉ bỏ qua case đó
     """
+    cases = []
     for case_name in os.listdir(TEST_DIR):
         case_path = os.path.join(TEST_DIR, case_name)
 
@@ -138,11 +174,30 @@ def run_all_tests():
                 except:
                     expected_similarity = None
 
-        run_one_case(case_name, case_path, expected_similarity)
+        cases.append((case_name, case_path, expected_similarity))
+
+    # Tiền xử lý song song: mỗi case có 2 file text1.txt, text2.txt
+    paths = []
+    for _, case_path, _ in cases:
+        paths.append(os.path.join(case_path, "text1.txt"))
+        paths.append(os.path.join(case_path, "text2.txt"))
+    records = preprocess_many(paths, workers=workers)
+
+    for k, (case_name, case_path, expected_similarity) in enumerate(cases):
+        rec1, rec2 = records[2 * k], records[2 * k + 1]
+        failed = [r for r in (rec1, rec2) if not r["ok"]]
+        if failed:
+            for r in failed:
+                print(f"Bỏ qua case {case_name}: lỗi tiền xử lý {r['path']}: {r['error']}")
+            continue
+
+        run_one_case(case_name, case_path, expected_similarity,
+                     data1=rec1["result"], data2=rec2["result"])
 
 
 # === Chương trình chính ===
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     print("Bắt đầu chạy toàn bộ bộ test...")
     run_all_tests()
     print("\nDữ liệu đã nằm trong thư mục evaluation_results")
@@ -0,0 +1,97 @@
+from array import array
+
+# Kiểu phần tử của mảng mã từ: 'I' = unsigned int 4 byte
+TOKEN_ID_TYPECODE = 'I'
+
+class Vocabulary:
+    """
+    Bảng từ vựng dùng chung: ánh xạ từ (str) <-> mã số nguyên (int)
+    Các văn bản muốn so sánh với nhau phải được mã hóa bằng CÙNG một Vocabulary
+    """
+
+    def __init__(self, tokens=None):
+        self.token_to_id = {}
+        self.id_to_token = []
+        if tokens:
+            for token in tokens:
+                self.intern(token)
+
+    def intern(self, token):
+        # Lấy mã của từ, thêm từ mới vào bảng nếu chưa có
+        idx = self.token_to_id.get(token)
+        if idx is None:
+            idx = len(self.id_to_token)
+            self.token_to_id[token] = idx
+            self.id_to_token.append(token)
+        return idx
+
+    def encode(self, tokens):
+        # Chuyển danh sách từ thành mảng mã số (4 byte/từ)
+        return array(TOKEN_ID_TYPECODE, map(self.intern, tokens))
+
+    def decode(self, ids):
+        # Chuyển mảng mã số về danh sách từ
+        id_to_token = self.id_to_token
+        return [id_to_token[i] for i in ids]
+
+    def token(self, idx):
+        return self.id_to_token[idx]
+
+    def __len__(self):
+        return len(self.id_to_token)
+
+    def __contains__(self, token):
+        return token in self.token_to_id
+
+
+class TokenDocument:
+    """
+    Văn bản biểu diễn gọn bằng mảng mã số từ + tham chiếu tới Vocabulary dùng chung
+    Dùng được trực tiếp ở các hàm so sánh như một list từ: len, duyệt, cắt lát, set(), Counter()
+    (phần tử là mã số nguyên nên băm nhanh hơn chuỗi tiếng Việt)
+    """
+
+    __slots__ = ('ids', 'vocab')
+
+    def __init__(self, ids, vocab):
+        self.ids = ids
+        self.vocab = vocab
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return iter(self.ids)
+
+    def __contains__(self, token_id):
+        return token_id in self.ids
+
+    def __getitem__(self, key):
+        # Cắt lát trả về TokenDocument (giữ Vocabulary) để segmenter dùng như với list
+        if isinstance(key, slice):
+            return TokenDocument(self.ids[key], self.vocab)
+        return self.ids[key]
+
+    def words(self):
+        # Giải mã về danh sách từ dạng chuỗi
+        return self.vocab.decode(self.ids)
+
+    def __repr__(self):
+        return f"TokenDocument({len(self.ids)} từ, vocab={len(self.vocab)})"
+
+
+def encode_document(words, vocab):
+    # Mã hóa danh sách từ thành TokenDocument với vocab dùng chung
+    return TokenDocument(vocab.encode(words), vocab)
+
+def to_words(seq):
+    # Trả về danh sách từ dạng chuỗi cho cả list[str] lẫn TokenDocument
+    if isinstance(seq, TokenDocument):
+        return seq.words()
+    return seq
+
+def decode_token(seq, token):
+    # Đổi một phần tử (mã số hoặc từ) của seq về dạng chuỗi để hiển thị
+    if isinstance(seq, TokenDocument):
+        return seq.vocab.token(token)
+    return token